@@ -39,6 +39,9 @@ else:
 class Settings(BaseSettings):
     # Environment variables
     geonames_username: str = getenv("GEONAMES_USERNAME", "")
+    geonames_cache_path: str = getenv("GEONAMES_CACHE_PATH", "cache/geonames_locations.sqlite3")
+    # Computed subjects kept per worker; each one holds roughly 50 KB
+    subject_cache_size: int = int(getenv("SUBJECT_CACHE_SIZE", "256"))
     env_type: str | bool = ENV_TYPE
 
     # Config file
@@ -4,13 +4,18 @@ Handles credential validation, rotation, and security for the open-source soluti
 """
 import os
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from typing import Optional, Dict, Any
 from ..config.settings import settings
 
 
 logger = logging.getLogger(__name__)
 
+# Seconds during which a previous validation timestamp is reused, and during
+# which a credential rejected by Geonames stays disabled before being retried
+VALIDATION_TTL = 60
+
 
 class CredentialManager:
     """
@@ -20,41 +25,72 @@ class CredentialManager:
     
     def __init__(self):
         self.username = settings.geonames_username
-        self._last_validation = None
+        # The username only changes on restart, so validity is computed once and
+        # only revoked, for VALIDATION_TTL seconds, when Geonames rejects the credential
+        self._is_valid: bool = bool(self.username)
+        self._invalid_reason: Optional[str] = None if self._is_valid else "Geonames username not configured"
+        # Unix time Geonames last rejected the credential
+        self._invalidated_at: Optional[float] = None
+        # Unix time of the last validation; formatted only when reported
+        self._last_validation: Optional[float] = None
         self._validation_result = None
         
     def is_credential_valid(self) -> bool:
         """Check if the current credential is valid"""
-        return bool(self.username)
+        # A rejection may be temporary (account re-enabled, hourly limit reset):
+        # once it is old enough, let the next Geonames call check it again
+        if self._invalidated_at is not None and time.time() - self._invalidated_at > VALIDATION_TTL:
+            logger.info("Retrying the Geonames credential rejected %ss ago", VALIDATION_TTL)
+            self._is_valid = True
+            self._invalid_reason = None
+            self._invalidated_at = None
+        return self._is_valid
+        
+    def invalidate(self, reason: str):
+        """Mark the credential as rejected by Geonames for VALIDATION_TTL seconds"""
+        if self._is_valid:
+            logger.error("Geonames credential rejected: %s", reason)
+        self._is_valid = False
+        self._invalid_reason = reason
+        self._invalidated_at = time.time()
         
     def get_current_credential_info(self) -> Dict[str, Any]:
         """Get information about the current credential"""
         return {
             "username": self.username,
             "is_valid": self.is_credential_valid(),
-            "last_validation": self._last_validation,
+            "last_validation": self._format_timestamp(self._last_validation),
             "validation_result": self._validation_result
         }
         
-    async def validate_credential(self) -> Dict[str, Any]:
+    def validate_credential(self) -> Dict[str, Any]:
         """Validate the current Geonames credential"""
         # In a real implementation, we would make a call to Geonames to validate the credential
         # For now, we'll just check if it's set
         
-        is_valid = bool(self.username)
-        self._last_validation = datetime.now()
+        is_valid = self.is_credential_valid()
+        
+        # Reuse the previous check if it is recent enough
+        now = time.time()
+        if self._last_validation is None or now - self._last_validation > VALIDATION_TTL:
+            self._last_validation = now
         self._validation_result = is_valid
         
         result = {
             "is_valid": is_valid,
-            "last_checked": self._last_validation.isoformat() if self._last_validation else None
+            "last_checked": self._format_timestamp(self._last_validation)
         }
         
         if not is_valid:
-            result["error"] = "Geonames username not configured"
+            result["error"] = self._invalid_reason
             
         return result
         
+    @staticmethod
+    def _format_timestamp(timestamp: Optional[float]) -> Optional[str]:
+        """Format a Unix timestamp as a local ISO 8601 string"""
+        return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+        
     def needs_rotation(self) -> bool:
         """Check if credentials need rotation (placeholder implementation)"""
         # In a real implementation, this would check if credential limits are approaching
@@ -3,12 +3,33 @@ PT-BR Localization and Optimization Module
 Provides Portuguese/Brazilian specific optimizations for the Geonames service
 """
 import logging
+import unicodedata
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from .service import GeonamesService
 
 
 logger = logging.getLogger(__name__)
 
+BRAZIL_COUNTRY_CODE = "BR"
+# Country codes whose Geonames rows get the Brazilian formatting
+BRAZILIAN_COUNTRY_CODES = frozenset({BRAZIL_COUNTRY_CODE})
+
+
+# Single-pass accent stripping for the (lowercase) letters used in Portuguese
+_DIACRITIC_TABLE = str.maketrans("áàâãäéèêëíìîïóòôõöúùûüç", "aaaaaeeeeiiiiooooouuuuc")
+
+
+@lru_cache(maxsize=4096)
+def _norm(value: str) -> str:
+    """Normalize a place name for lookups: strip diacritics and casefold"""
+    stripped = value.casefold().translate(_DIACRITIC_TABLE)
+    if stripped.isascii():
+        return stripped
+    # Characters outside the table: fall back to full Unicode decomposition
+    decomposed = unicodedata.normalize("NFKD", stripped)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
 
 class PtBrOptimizer:
     """
@@ -67,18 +88,53 @@ class PtBrOptimizer:
         "tocantins": "Palmas"
     }
     
+    # Timezones of common Brazilian cities
+    BRAZIL_TIMEZONES = {
+        "são paulo": "America/Sao_Paulo",
+        "rio de janeiro": "America/Sao_Paulo", 
+        "brasília": "America/Sao_Paulo",
+        "salvador": "America/Bahia",
+        "fortaleza": "America/Fortaleza",
+        "belo horizonte": "America/Sao_Paulo",
+        "manaus": "America/Manaus",
+        "curitiba": "America/Sao_Paulo",
+        "recife": "America/Recife",
+        "porto alegre": "America/Sao_Paulo",
+        "belém": "America/Belem",
+        "goiânia": "America/Sao_Paulo",
+        "boavista": "America/Boa_Vista"
+    }
+    
+    # Lookup tables keyed by normalized names, so "sao paulo" matches "são paulo"
+    _NORM_CITIES = {_norm(k): v for k, v in BRAZILIAN_CITIES.items()}
+    _NORM_STATE_CAPITALS = {_norm(k): v for k, v in BRAZIL_STATE_CAPITALS.items()}
+    _NORM_TIMEZONES = {_norm(k): v for k, v in BRAZIL_TIMEZONES.items()}
+    
+    # Fields copied by format_brazilian_location: output key -> Geonames key
+    _LOCATION_FIELDS = {
+        "name": "name",
+        "country_code": "countryCode",
+        "country_name": "countryName",
+        "admin_code": "adminCode1",
+        "admin_name": "adminName1",
+        "latitude": "lat",
+        "longitude": "lng",
+        "population": "population",
+        "fcode": "fcode",
+    }
+    _LOCATION_KEYS = tuple(_LOCATION_FIELDS)
+    _GEONAME_KEYS = tuple(_LOCATION_FIELDS.values())
+    
     def __init__(self, geonames_service: GeonamesService):
         self.geonames_service = geonames_service
         
     def get_portuguese_city_name(self, city_name: str) -> str:
         """Get the Portuguese name for a city if available"""
-        normalized = city_name.lower()
-        return self.BRAZILIAN_CITIES.get(normalized, city_name)
+        return _lookup_city(city_name)
         
     def get_brazilian_state_capital(self, state: str) -> Optional[str]:
         """Get the capital of a Brazilian state"""
-        normalized = state.lower()
-        return self.BRAZIL_STATE_CAPITALS.get(normalized)
+        return self._NORM_STATE_CAPITALS.get(_norm(state))
         
     async def search_brazilian_places(self, 
                                      query: str, 
@@ -88,58 +144,51 @@ class PtBrOptimizer:
         result = await self.geonames_service.search(query, max_results, lang='pt')
         
         if result and result.get('geonames'):
-            # Enhance results with Portuguese names where available
+            # Enhance results with Portuguese names where available. The result is
+            # shared with the service cache, so enhanced rows are new dicts
+            geonames = []
             for geoname in result['geonames']:
-                if geoname.get('countryCode') == 'BR':
+                if geoname.get('countryCode') in BRAZILIAN_COUNTRY_CODES:
                     # Add Portuguese name if available
-                    portuguese_name = self.get_portuguese_city_name(geoname.get('name', ''))
-                    if portuguese_name != geoname.get('name'):
-                        geoname['portugueseName'] = portuguese_name
+                    name = geoname.get('name', '')
+                    portuguese_name = self.get_portuguese_city_name(name)
+                    if portuguese_name != name:
+                        geoname = {**geoname, 'portugueseName': portuguese_name}
+                geonames.append(geoname)
+            result = {**result, 'geonames': geonames}
                         
         return result
         
-    async def get_brazil_timezone(self, city_name: str) -> Optional[str]:
+    def get_brazil_timezone(self, city_name: str) -> Optional[str]:
         """Get the timezone for a Brazilian city"""
-        # Map common Brazilian cities to their timezones
-        brazil_timezones = {
-            "são paulo": "America/Sao_Paulo",
-            "rio de janeiro": "America/Sao_Paulo", 
-            "brasília": "America/Sao_Paulo",
-            "salvador": "America/Bahia",
-            "fortaleza": "America/Fortaleza",
-            "belo horizonte": "America/Sao_Paulo",
-            "manaus": "America/Manaus",
-            "curitiba": "America/Sao_Paulo",
-            "recife": "America/Recife",
-            "porto alegre": "America/Sao_Paulo",
-            "belém": "America/Belem",
-            "goiânia": "America/Sao_Paulo",
-            "boavista": "America/Boa_Vista"
-        }
-        
-        normalized = city_name.lower()
-        return brazil_timezones.get(normalized)
+        return self._NORM_TIMEZONES.get(_norm(city_name))
         
-    async def format_brazilian_location(self, 
-                                       geoname: Dict[str, Any]) -> Dict[str, Any]:
+    def format_brazilian_location(self, 
+                                  geoname: Dict[str, Any]) -> Dict[str, Any]:
         """Format location data with Brazilian-specific information"""
-        formatted = {
-            "name": geoname.get('name'),
-            "portuguese_name": self.get_portuguese_city_name(geoname.get('name', '')),
-            "country_code": geoname.get('countryCode'),
-            "country_name": geoname.get('countryName'),
-            "admin_code": geoname.get('adminCode1'),
-            "admin_name": geoname.get('adminName1'),
-            "latitude": geoname.get('lat'),
-            "longitude": geoname.get('lng'),
-            "population": geoname.get('population'),
-            "timezone": await self.get_brazil_timezone(geoname.get('name', '')),
-            "fcode": geoname.get('fcode')
-        }
+        name = geoname.get('name') or ''
+        formatted = dict(zip(self._LOCATION_KEYS, map(geoname.get, self._GEONAME_KEYS)))
+        formatted["portuguese_name"] = self.get_portuguese_city_name(name)
+        formatted["timezone"] = self._NORM_TIMEZONES.get(_norm(name))
         
         # If it's a Brazilian location, add Brazilian-specific info
-        if geoname.get('countryCode') == 'BR':
+        if formatted["country_code"] in BRAZILIAN_COUNTRY_CODES:
             formatted["is_brazilian"] = True
             formatted["timezone"] = formatted["timezone"] or "America/Sao_Paulo"
             
-        return formatted
\ No newline at end of file
+        return formatted
+        
+    def format_brazilian_results(self, 
+                                 geonames: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Format the Brazilian rows of a search result in one pass, keeping the others and their order"""
+        fmt = self.format_brazilian_location
+        return [
+            fmt(geoname) if geoname.get('countryCode') in BRAZILIAN_COUNTRY_CODES else geoname
+            for geoname in geonames
+        ]
+
+
+@lru_cache(maxsize=4096)
+def _lookup_city(city_name: str) -> str:
+    """Cached Portuguese-name lookup; user input repeats heavily across requests"""
+    return PtBrOptimizer._NORM_CITIES.get(_norm(city_name), city_name)
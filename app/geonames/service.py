@@ -5,13 +5,20 @@ and rate limiting for the open-source solution.
 """
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import aiohttp
+import orjson
+from cachetools import TTLCache
 from ..config.settings import settings
+from .rate_limiter import RateLimiter, RateLimitExceeded
+from .credential_manager import CredentialManager
 
 
 logger = logging.getLogger(__name__)
 
+# Geonames "status.value" code for a rejected username (authorization exception)
+AUTHORIZATION_ERROR_CODES = frozenset({10})
+
 
 class GeonamesService:
     """
@@ -19,23 +26,63 @@ class GeonamesService:
     rate limiting, and caching for the open-source solution.
     """
     
-    def __init__(self):
+    def __init__(self, 
+                 rate_limiter: Optional[RateLimiter] = None,
+                 credential_manager: Optional[CredentialManager] = None):
         self.base_url = "http://api.geonames.org"
         self.username = settings.geonames_username
+        # Only calls that actually reach Geonames are counted; cache hits are free
+        self.rate_limiter = rate_limiter
+        # Told when Geonames rejects the username, so the gateway stops forwarding calls
+        self.credential_manager = credential_manager
         self._session: Optional[aiohttp.ClientSession] = None
-        self.cache: Dict[str, Any] = {}
+        # Successful responses keyed by endpoint and request parameters
+        self.cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        # Country data is effectively static, so it is kept for a day
+        self.static_cache: TTLCache = TTLCache(maxsize=1_000, ttl=86400)
+        # Upstream calls in progress, keyed like the caches
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._loads = orjson.loads
+        self._urls = {
+            endpoint: f"{self.base_url}/{endpoint}"
+            for endpoint in ("searchJSON", "timezoneJSON", "citiesJSON", "countryInfoJSON")
+        }
         
+    async def start(self) -> aiohttp.ClientSession:
+        """Open the shared HTTP session (keep-alive connection pool and DNS cache) and return it"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=30
+                ),
+                # A stalled Geonames call must not hold the request open indefinitely
+                timeout=aiohttp.ClientTimeout(total=10, connect=3),
+                headers={"Accept-Encoding": "gzip"},
+                raise_for_status=True,
+            )
+        return self._session
+            
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            
     async def __aenter__(self):
         """Async context manager entry"""
-        self._session = aiohttp.ClientSession()
+        await self.start()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self._session:
-            await self._session.close()
+        await self.close()
             
-    async def get_credential_status(self) -> Dict[str, Any]:
+    @staticmethod
+    def _cache_key(endpoint: str, params: Dict[str, Any]) -> Tuple:
+        """Build a hashable cache key for an endpoint call"""
+        return (endpoint, frozenset(params.items()))
+        
+    def get_credential_status(self) -> Dict[str, Any]:
         """Get current credential status and usage information"""
         if not self.username:
             return {
@@ -49,6 +96,73 @@ class GeonamesService:
             "has_credential": bool(self.username)
         }
         
+    async def _call(self, 
+                    endpoint: str, 
+                    params: Dict[str, Any],
+                    cache_key: Optional[Tuple] = None,
+                    cache: Optional[TTLCache] = None) -> Optional[Dict[str, Any]]:
+        """
+        Call a Geonames JSON endpoint, serving and storing results through the cache.
+        Raises RateLimitExceeded when a cache miss would go over the rate limit.
+        """
+        if not self.username:
+            raise ValueError("Geonames username is required")
+            
+        if cache is None:
+            cache = self.cache
+        key = cache_key or self._cache_key(endpoint, params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+            
+        # An identical call is already on its way to Geonames: wait for its answer
+        # instead of spending another upstream request (shielded, so a cancelled
+        # follower does not cancel the shared result)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+            
+        if self.rate_limiter is not None and not self.rate_limiter.is_allowed():
+            raise RateLimitExceeded()
+            
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        data = None
+        try:
+            # Fallback for callers that did not go through the app startup hook
+            session = await self.start()
+            
+            # Callers pass a fresh dict, so the credential is added in place rather than
+            # copying the parameters; it is kept out of the cache key above
+            params['username'] = self.username
+            
+            try:
+                async with session.get(self._urls[endpoint], params=params) as response:
+                    data = self._loads(await response.read())
+            except asyncio.TimeoutError:
+                logger.warning("Geonames %s timed out", endpoint)
+            except aiohttp.ClientResponseError as e:
+                logger.warning("Geonames %s answered HTTP %s", endpoint, e.status)
+            except (aiohttp.ClientError, orjson.JSONDecodeError) as e:
+                logger.warning("Geonames %s failed: %r", endpoint, e)
+            except Exception:
+                logger.exception("Unexpected error calling Geonames %s", endpoint)
+            else:
+                # Geonames reports errors as 200 responses with a "status" object;
+                # those are passed through but never cached
+                status = data.get("status") if isinstance(data, dict) else None
+                if status is None:
+                    cache[key] = data
+                else:
+                    logger.warning("Geonames %s error: %s", endpoint, status.get("message"))
+                    if self.credential_manager is not None and status.get("value") in AUTHORIZATION_ERROR_CODES:
+                        self.credential_manager.invalidate(status.get("message") or "Geonames authorization error")
+        finally:
+            del self._inflight[key]
+            future.set_result(data)
+            
+        return data
+        
     async def search(self, 
                     q: str, 
                     max_rows: int = 10, 
@@ -57,62 +171,22 @@ class GeonamesService:
         """
         Search for places using Geonames API
         """
-        if not self._session:
-            raise RuntimeError("Service not initialized properly")
-            
-        if not self.username:
-            raise ValueError("Geonames username is required")
-            
-        params = {
-            'q': q,
-            'maxRows': max_rows,
-            'lang': lang,
-            'style': style,
-            'username': self.username
-        }
+        q = q.strip()
+        params = {'q': q, 'maxRows': max_rows, 'lang': lang, 'style': style}
+        # Geonames search is case-insensitive, so "Rome" and "rome " share an entry
+        cache_key = self._cache_key("searchJSON", {**params, 'q': q.lower()})
+        return await self._call("searchJSON", params, cache_key)
         
-        try:
-            async with self._session.get(f"{self.base_url}/searchJSON", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    logger.error(f"Geonames search error: {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Geonames search exception: {str(e)}")
-            return None
-            
     async def get_timezone(self, 
                           lat: float, 
                           lng: float) -> Optional[Dict[str, Any]]:
         """
         Get timezone information for coordinates
         """
-        if not self._session:
-            raise RuntimeError("Service not initialized properly")
-            
-        if not self.username:
-            raise ValueError("Geonames username is required")
-            
-        params = {
-            'lat': lat,
-            'lng': lng,
-            'username': self.username
-        }
+        # Nearby coordinates (~11 m) share the same cache entry
+        cache_key = self._cache_key("timezoneJSON", {'lat': round(lat, 4), 'lng': round(lng, 4)})
+        return await self._call("timezoneJSON", {'lat': lat, 'lng': lng}, cache_key)
         
-        try:
-            async with self._session.get(f"{self.base_url}/timezoneJSON", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    logger.error(f"Geonames timezone error: {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Geonames timezone exception: {str(e)}")
-            return None
-            
     async def get_cities(self, 
                         north: float, 
                         south: float, 
@@ -122,56 +196,11 @@ class GeonamesService:
         """
         Get cities in a bounding box
         """
-        if not self._session:
-            raise RuntimeError("Service not initialized properly")
-            
-        if not self.username:
-            raise ValueError("Geonames username is required")
-            
-        params = {
-            'north': north,
-            'south': south,
-            'east': east,
-            'west': west,
-            'lang': lang,
-            'username': self.username
-        }
+        params = {'north': north, 'south': south, 'east': east, 'west': west, 'lang': lang}
+        return await self._call("citiesJSON", params)
         
-        try:
-            async with self._session.get(f"{self.base_url}/citiesJSON", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    logger.error(f"Geonames cities error: {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Geonames cities exception: {str(e)}")
-            return None
-            
     async def get_country_info(self, country: str) -> Optional[Dict[str, Any]]:
         """
         Get country information
         """
-        if not self._session:
-            raise RuntimeError("Service not initialized properly")
-            
-        if not self.username:
-            raise ValueError("Geonames username is required")
-            
-        params = {
-            'country': country,
-            'username': self.username
-        }
-        
-        try:
-            async with self._session.get(f"{self.base_url}/countryInfoJSON", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    logger.error(f"Geonames country info error: {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Geonames country info exception: {str(e)}")
-            return None
\ No newline at end of file
+        return await self._call("countryInfoJSON", {'country': country}, cache=self.static_cache)
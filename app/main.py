@@ -4,15 +4,40 @@
 
 import logging
 import logging.config
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .routers import main_router, geonames_router
+from .routers.geonames_router import geonames_service, credential_manager
+from .middleware.geonames_gateway_middleware import GeonamesGatewayMiddleware
+from .utils.geonames_json_responses import RateLimitExceededJsonResponse
+from .geonames.rate_limiter import RateLimitExceeded
+from .utils.queue_logging import start_queue_logging
 from .config.settings import settings
 
 
 logging.config.dictConfig(settings.LOGGING_CONFIG)
+# Application and access log records are written by background threads
+log_listeners = start_queue_logging(logging.getLogger(), logging.getLogger("uvicorn.access"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared Geonames HTTP session (keep-alive + DNS cache) for the whole process
+    await geonames_service.start()
+    # Pay the cold ephemeris and chart rendering cost before serving traffic
+    await run_in_threadpool(main_router.warm_up)
+    yield
+    await geonames_service.close()
+    for listener in log_listeners:
+        listener.stop()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     debug=settings.debug,
     docs_url=settings.docs_url,
     redoc_url=settings.redoc_url,
@@ -42,4 +67,14 @@ app.include_router(geonames_router, tags=["Geonames"])
 # Middleware
 #------------------------------------------------------------------------------
 
-# No middleware required for open-source deployment
+app.add_middleware(GeonamesGatewayMiddleware, credential_manager=credential_manager)
+# Outermost, so chart SVGs are compressed on the way out; level 6 keeps CPU low
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+#------------------------------------------------------------------------------
+# Exception handlers
+#------------------------------------------------------------------------------
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request, exc):
+    return RateLimitExceededJsonResponse
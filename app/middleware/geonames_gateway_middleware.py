@@ -0,0 +1,56 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+import logging
+
+from ..geonames.credential_manager import CredentialManager
+from ..utils.write_request_to_log import get_write_request_to_log
+from ..utils.geonames_json_responses import MissingCredentialsJsonResponse
+
+
+logger = logging.getLogger(__name__)
+write_request_to_log = get_write_request_to_log(logger)
+
+
+class GeonamesGatewayMiddleware:
+    """
+    Single entry point for the Geonames endpoints: logs each request under
+    `path_prefix` once, then (except for the exempt paths) rejects it with a 401
+    when no Geonames credential is configured, before it reaches the router.
+    The check reads the credential manager's cached flag, which GeonamesService
+    clears if Geonames rejects the username. Rate limiting is left to
+    GeonamesService, so that cached answers never count against the limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        credential_manager: CredentialManager,
+        path_prefix: str = "/api/v4/geonames/",
+        exempt_paths: tuple = ("/api/v4/geonames/status",),
+    ) -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+        self.exempt_paths = frozenset(exempt_paths)
+        self.is_credential_valid = credential_manager.is_credential_valid
+
+        if not credential_manager.is_credential_valid():
+            logging.warning("Geonames username not configured. Geonames endpoints will answer with 401.")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        # Only wrap the scope in a Request when the line will actually be logged
+        if logger.isEnabledFor(logging.INFO):
+            write_request_to_log(logging.INFO, Request(scope), "Geonames request")
+
+        if not self.is_credential_valid() and scope["path"] not in self.exempt_paths:
+            await MissingCredentialsJsonResponse(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
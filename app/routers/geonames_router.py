@@ -2,28 +2,54 @@
 Geonames API Router
 Provides the API endpoints for Geonames functionality in the open-source solution
 """
-from fastapi import APIRouter, HTTPException, Depends, Request
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, Response
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime
+from hashlib import blake2b
 import logging
+import orjson
+from cachetools import TTLCache
 from ..geonames.service import GeonamesService
 from ..geonames.credential_manager import CredentialManager
 from ..geonames.rate_limiter import RateLimiter
 from ..geonames.pt_br_optimizer import PtBrOptimizer
-from ..utils.write_request_to_log import get_write_request_to_log
 from ..config.settings import settings
+from ..utils.geonames_json_responses import GeonamesServiceErrorJsonResponse
 
 
 logger = logging.getLogger(__name__)
-write_request_to_log = get_write_request_to_log(logger)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Initialize services
-geonames_service = GeonamesService()
 credential_manager = CredentialManager()
 rate_limiter = RateLimiter()
+geonames_service = GeonamesService(rate_limiter, credential_manager)
 pt_br_optimizer = PtBrOptimizer(geonames_service)
 
+# Bound once so the handlers skip the attribute lookups on every call
+_search = geonames_service.search
+_get_timezone = geonames_service.get_timezone
+_get_country_info = geonames_service.get_country_info
+_search_brazilian_places = pt_br_optimizer.search_brazilian_places
+_format_brazilian_results = pt_br_optimizer.format_brazilian_results
+
+# Encoded country-info bodies and their ETags, keyed by country. Each entry keeps
+# the service result it was built from, so a refreshed result is re-encoded.
+_country_info_bodies: TTLCache = TTLCache(maxsize=1_000, ttl=86400)
+
+# Fixed part of the status payload; the handler copies it and adds the live fields
+_STATUS_TEMPLATE: Dict[str, Any] = {
+    "status": "OK",
+    "service": "Geonames Open Source Service",
+}
+
+
+# Request logging and credential checks for these endpoints are done once per
+# request by GeonamesGatewayMiddleware; the RateLimitExceeded raised by the
+# service on a cache miss is turned into a 429 by the handler in app/main.py.
+
 
 @router.get("/api/v4/geonames/status", 
             response_description="Geonames service status",
@@ -32,27 +58,12 @@ async def geonames_status(request: Request):
     """
     Get the status of the Geonames service including credential status and rate limiting.
     """
-    write_request_to_log(20, request, "Geonames status check")
+    response = _STATUS_TEMPLATE.copy()
+    response["credential_status"] = credential_manager.validate_credential()
+    response["rate_limiting"] = rate_limiter.get_usage_stats()
+    response["timestamp"] = datetime.now().isoformat()
     
-    try:
-        # Check credential status
-        credential_status = await credential_manager.validate_credential()
-        
-        # Check rate limiting status
-        rate_limit_status = await rate_limiter.get_usage_stats()
-        
-        response = {
-            "status": "OK",
-            "service": "Geonames Open Source Service",
-            "credential_status": credential_status,
-            "rate_limiting": rate_limit_status,
-            "timestamp": "datetime.now().isoformat()"  # In a real implementation
-        }
-        
-        return response
-    except Exception as e:
-        logger.error(f"Geonames status error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    return ORJSONResponse(content=response)
 
 
 @router.get("/api/v4/geonames/search", 
@@ -60,36 +71,20 @@ async def geonames_status(request: Request):
             include_in_schema=True)
 async def geonames_search(
     request: Request,
-    q: str,
-    max_rows: int = 10,
+    q: str = Query(..., min_length=1),
+    max_rows: int = Query(10, ge=1, le=1000),
     lang: str = "en",
-    style: str = "medium"
+    style: str = Query("medium", pattern="^(short|medium|long|full)$")
 ):
     """
     Search for places using Geonames API with built-in rate limiting and credential management.
     """
-    write_request_to_log(20, request, f"Geonames search for: {q}")
-    
-    # Check rate limiting
-    if not await rate_limiter.is_allowed():
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    result = await _search(q, max_rows, lang, style)
     
-    try:
-        # Check if we have valid credentials
-        if not credential_manager.is_credential_valid():
-            raise HTTPException(status_code=401, detail="Geonames credentials not configured")
-            
-        result = await geonames_service.search(q, max_rows, lang, style)
+    if result is None:
+        return GeonamesServiceErrorJsonResponse
         
-        if result is None:
-            raise HTTPException(status_code=500, detail="Error contacting Geonames service")
-            
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Geonames search error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    return ORJSONResponse(content=result)
 
 
 @router.get("/api/v4/geonames/timezone", 
@@ -97,34 +92,18 @@ async def geonames_search(
             include_in_schema=True)
 async def geonames_timezone(
     request: Request,
-    lat: float,
-    lng: float
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180)
 ):
     """
     Get timezone information for specific coordinates using Geonames API.
     """
-    write_request_to_log(20, request, f"Geonames timezone for coordinates: {lat}, {lng}")
-    
-    # Check rate limiting
-    if not await rate_limiter.is_allowed():
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    result = await _get_timezone(lat, lng)
     
-    try:
-        # Check if we have valid credentials
-        if not credential_manager.is_credential_valid():
-            raise HTTPException(status_code=401, detail="Geonames credentials not configured")
-            
-        result = await geonames_service.get_timezone(lat, lng)
+    if result is None:
+        return GeonamesServiceErrorJsonResponse
         
-        if result is None:
-            raise HTTPException(status_code=500, detail="Error contacting Geonames service")
-            
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Geonames timezone error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    return ORJSONResponse(content=result)
 
 
 @router.get("/api/v4/geonames/brazilian-search", 
@@ -132,45 +111,23 @@ async def geonames_timezone(
             include_in_schema=True)
 async def geonames_brazilian_search(
     request: Request,
-    q: str,
-    max_results: int = 10
+    q: str = Query(..., min_length=1),
+    max_results: int = Query(10, ge=1, le=1000)
 ):
     """
     Optimized search for Brazilian places with Portuguese localization.
     """
-    write_request_to_log(20, request, f"Brazilian Geonames search for: {q}")
+    result = await _search_brazilian_places(q, max_results)
     
-    # Check rate limiting
-    if not await rate_limiter.is_allowed():
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
-    
-    try:
-        # Check if we have valid credentials
-        if not credential_manager.is_credential_valid():
-            raise HTTPException(status_code=401, detail="Geonames credentials not configured")
-            
-        result = await pt_br_optimizer.search_brazilian_places(q, max_results)
+    if result is None:
+        return GeonamesServiceErrorJsonResponse
+        
+    # Format Brazilian locations with Portuguese information
+    if result.get('geonames'):
+        # Build a new dict: the service result may be shared through its cache
+        result = {**result, 'geonames': _format_brazilian_results(result['geonames'])}
         
-        if result is None:
-            raise HTTPException(status_code=500, detail="Error contacting Geonames service")
-            
-        # Format Brazilian locations with Portuguese information
-        if result.get('geonames'):
-            formatted_geonames = []
-            for geoname in result['geonames']:
-                if geoname.get('countryCode') == 'BR':
-                    formatted_geoname = await pt_br_optimizer.format_brazilian_location(geoname)
-                    formatted_geonames.append(formatted_geoname)
-                else:
-                    formatted_geonames.append(geoname)
-            result['geonames'] = formatted_geonames
-            
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Brazilian Geonames search error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    return ORJSONResponse(content=result)
 
 
 @router.get("/api/v4/geonames/country-info", 
@@ -178,30 +135,26 @@ async def geonames_brazilian_search(
             include_in_schema=True)
 async def geonames_country_info(
     request: Request,
-    country: str
+    country: str = Query(..., min_length=2, max_length=2)
 ):
     """
     Get information about a specific country from Geonames.
     """
-    write_request_to_log(20, request, f"Geonames country info for: {country}")
+    result = await _get_country_info(country)
     
-    # Check rate limiting
-    if not await rate_limiter.is_allowed():
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    if result is None:
+        return GeonamesServiceErrorJsonResponse
+        
+    entry: Optional[Tuple[Dict[str, Any], str, bytes]] = _country_info_bodies.get(country)
+    if entry is None or entry[0] is not result:
+        body = orjson.dumps(result)
+        entry = (result, f'"{blake2b(body, digest_size=8).hexdigest()}"', body)
+        _country_info_bodies[country] = entry
+    _, etag, body = entry
     
-    try:
-        # Check if we have valid credentials
-        if not credential_manager.is_credential_valid():
-            raise HTTPException(status_code=401, detail="Geonames credentials not configured")
-            
-        result = await geonames_service.get_country_info(country)
+    # Country data is effectively static: let clients and proxies revalidate cheaply
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
         
-        if result is None:
-            raise HTTPException(status_code=500, detail="Error contacting Geonames service")
-            
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Geonames country info error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,21 +1,44 @@
 # External Libraries
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from asyncio import gather
+from datetime import datetime, timezone
+from random import random
+from time import monotonic
+from functools import partial
+from threading import Lock
+from typing import Any, Awaitable, Callable, Literal, Optional
+import orjson
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
 from logging import getLogger
 from kerykeion import (
     AstrologicalSubject, 
-    KerykeionChartSVG, 
     SynastryAspects, 
     NatalAspects, 
-    RelationshipScoreFactory, 
-    CompositeSubjectFactory
+    RelationshipScoreFactory
 )
 from kerykeion.settings.config_constants import DEFAULT_ACTIVE_POINTS, DEFAULT_ACTIVE_ASPECTS
+from kerykeion.kr_types.kr_models import AspectModel, RelationshipScoreAspectModel
+from pydantic import TypeAdapter
+from cachetools import LRUCache, cached
 
 # Local
-from ..utils.internal_server_error_json_response import InternalServerErrorJsonResponse
+from ..config.settings import settings
+from ..utils.internal_server_error_json_response import InternalServerErrorJsonResponse, GeonamesNotFoundJsonResponse
 from ..utils.get_time_from_google import get_time_from_google
 from ..utils.write_request_to_log import get_write_request_to_log
+from ..utils.errors import GeonamesCityNotFoundError
+from ..utils.subject_cache import (
+    composite_key,
+    get_composite_subject,
+    get_subject,
+    subject_from_model,
+    transit_subject_from_model
+)
+from ..utils.svg_shrink import shrink_svg
+from ..utils.multipart_chart_response import multipart_chart_response
+from ..utils.chart_svg import CachedKerykeionChartSVG
+from ..utils.orjson_route import ORJSONRoute
 from ..types.request_models import (
     BirthDataRequestModel,
     BirthChartRequestModel,
@@ -41,919 +64,641 @@ from ..types.response_models import (
 logger = getLogger(__name__)
 write_request_to_log = get_write_request_to_log(logger)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse, route_class=ORJSONRoute)
 
-GEONAMES_ERROR_MESSAGE = "City/Nation name error or invalid GeoNames username. Please check your username or city name and try again. You can create a free username here: https://www.geonames.org/login/. If you want to bypass the usage of GeoNames, please remove the geonames_username field from the request. Note: The nation field should be the country code (e.g. US, UK, FR, DE, etc.)."
+# "multipart" sends the chart SVG as its own part instead of a JSON string
+ChartFormat = Literal["json", "multipart"]
+ChartFormatQuery = Query(
+    "json",
+    alias="format",
+    description="Response format: json, or multipart/mixed with the JSON data followed by the raw SVG chart.",
+)
 
-@router.get("/api/v4/health", response_description="Health check", include_in_schema=False)
-async def health(request: Request) -> JSONResponse:
+# Serializers for aspect lists, built once and applied to a whole list in one call
+_ASPECTS_ADAPTER = TypeAdapter(list[AspectModel])
+_SCORE_ASPECTS_ADAPTER = TypeAdapter(list[RelationshipScoreAspectModel])
+
+# Health checks are polled constantly, only this fraction of them is logged
+HEALTH_CHECK_LOG_SAMPLE_RATE = 0.001
+
+# The source subjects are returned on their own, not inside the composite subject
+_COMPOSITE_SUBJECT_EXCLUDE = frozenset({"first_subject", "second_subject"})
+
+# Constant bodies, encoded once
+HealthCheckJsonResponse = ORJSONResponse(content={"status": "OK"}, status_code=200)
+# The settings do not change while the process runs
+StatusJsonResponse = ORJSONResponse(
+    content={
+        "status": "OK",
+        "environment": settings.env_type,
+        "debug": settings.debug,
+    },
+    status_code=200,
+)
+
+# Encoded /api/v4/now body and the monotonic time at which its minute ends
+_now_body: bytes = b""
+_now_expires_at: float = 0.0
+
+
+def _render_chart(kerykeion_chart: CachedKerykeionChartSVG, wheel_only: bool) -> str:
     """
-    Health check endpoint.
+    Renders the minified and shrunk SVG of a chart, wheel only if requested.
     """
 
-    write_request_to_log(20, request, "Health check")
+    if wheel_only:
+        return shrink_svg(kerykeion_chart.makeWheelOnlyTemplate(minify=True))
 
-    return JSONResponse(content={"status": "OK"}, status_code=200)
+    return shrink_svg(kerykeion_chart.makeTemplate(minify=True))
 
 
-@router.get("/", response_description="Status of the API", response_model=BirthDataResponseModel, include_in_schema=False)
-async def status(request: Request) -> JSONResponse:
+@cached(LRUCache(maxsize=128), key=composite_key, lock=Lock())
+def _render_composite_chart(
+    first_subject: AstrologicalSubject,
+    second_subject: AstrologicalSubject,
+    theme: Optional[str],
+    wheel_only: bool,
+) -> tuple[str, list[dict]]:
     """
-    Returns the status of the API.
+    Renders the composite chart SVG and aspects of two subjects from get_subject.
+    Repeated composite chart requests skip the rendering. The returned values are
+    shared, callers must not modify them.
     """
 
-    from ..config.settings import settings
-
-    write_request_to_log(20, request, "API is up and running")
-    response_dict = {
-        "status": "OK",
-        "environment": settings.env_type,
-        "debug": settings.debug,
-    }
+    kerykeion_chart = CachedKerykeionChartSVG(
+        get_composite_subject(first_subject, second_subject),
+        chart_type="Composite",
+        theme=theme, # type: ignore
+    )
 
-    return JSONResponse(content=response_dict, status_code=200)
+    return _render_chart(kerykeion_chart, wheel_only), _ASPECTS_ADAPTER.dump_python(kerykeion_chart.aspects_list)
 
 
-@router.get("/api/v4/now", response_description="Current astrological data", response_model=BirthDataResponseModel)
-async def get_now(request: Request) -> JSONResponse:
+@cached(LRUCache(maxsize=512), key=composite_key, lock=Lock())
+def _composite_aspects(
+    first_subject: AstrologicalSubject,
+    second_subject: AstrologicalSubject,
+    active_points: tuple[str, ...],
+    active_aspects: tuple[tuple[str, int], ...],
+) -> list[dict]:
     """
-    Retrieve astrological data for the current moment.
+    Computes the dumped aspects of the composite of two subjects from get_subject,
+    for a point and aspect selection given as tuples, so it can be the cache key.
+    The returned list is shared, callers must not modify it.
     """
 
-    # Get current UTC time from the time API
-    write_request_to_log(20, request, "Getting current astrological data")
-    
-    logger.debug("Getting current UTC time from the time API")
-    try:
-        utc_datetime = get_time_from_google()
-        datetime_dict = {
-            "year": utc_datetime.year, # type: ignore
-            "month": utc_datetime.month, # type: ignore
-            "day": utc_datetime.day, # type: ignore
-            "hour": utc_datetime.hour, # type: ignore
-            "minute": utc_datetime.minute, # type: ignore
-            "second": utc_datetime.second, # type: ignore
-        }
-    except Exception as e:
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
-    logger.debug(f"Current UTC time: {datetime_dict}")
+    aspects = NatalAspects(
+        get_composite_subject(first_subject, second_subject),
+        active_points=list(active_points), # type: ignore
+        active_aspects=[{"name": name, "orb": orb} for name, orb in active_aspects], # type: ignore
+    ).relevant_aspects
 
-    try:
-        # On some Cloud providers, the time is not set correctly, so we need to get the current UTC time from the time API
-        today_subject = AstrologicalSubject(
-            city="GMT",
-            nation="UK",
-            lat=51.477928,
-            lng=-0.001545,
-            tz_str="GMT",
-            year=datetime_dict["year"],
-            month=datetime_dict["month"],
-            day=datetime_dict["day"],
-            hour=datetime_dict["hour"],
-            minute=datetime_dict["minute"],
-            online=False,
-        )
+    return _ASPECTS_ADAPTER.dump_python(aspects)
 
-        response_dict = {"status": "OK", "data": today_subject.model().model_dump()}
 
-        return JSONResponse(content=response_dict, status_code=200)
+def _dump_subject(astrological_subject: AstrologicalSubject) -> dict:
+    """
+    Returns the response data of a subject.
+    """
 
-    except Exception as e:
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    return astrological_subject.model().model_dump(round_trip=False, warnings=False)
 
 
-@router.post("/api/v4/birth-data", response_description="Birth data", response_model=BirthDataResponseModel)
-async def birth_data(birth_data_request: BirthDataRequestModel, request: Request):
+def _greenwich_subject(year: int, month: int, day: int, hour: int, minute: int) -> AstrologicalSubject:
     """
-    Retrieve astrological data for a specific birth date. Does not include the chart nor the aspects.
+    Returns the subject of a UTC moment at Greenwich.
     """
 
-    write_request_to_log(20, request, f"Birth data request")
+    return get_subject(
+        name="Now",
+        year=year,
+        month=month,
+        day=day,
+        hour=hour,
+        minute=minute,
+        city="GMT",
+        nation="UK",
+        lat=51.477928,
+        lng=-0.001545,
+        tz_str="GMT",
+        zodiac_type="Tropic",
+        sidereal_mode=None,
+        houses_system_identifier="P",
+        perspective_type="Apparent Geocentric",
+        geonames_username=None,
+    )
+
+
+def warm_up() -> None:
+    """
+    Computes and renders the current moment at Greenwich once, so the ephemeris
+    files, kerykeion settings and chart code are loaded before the first request.
+    """
 
-    subject = birth_data_request.subject
+    now = datetime.now(timezone.utc)
+    today_subject = _greenwich_subject(now.year, now.month, now.day, now.hour, now.minute)
+    _render_chart(CachedKerykeionChartSVG(today_subject), wheel_only=False)
 
-    try:
-        astrological_subject = AstrologicalSubject(
-            name=subject.name,
-            year=subject.year,
-            month=subject.month,
-            day=subject.day,
-            hour=subject.hour,
-            minute=subject.minute,
-            city=subject.city,
-            nation=subject.nation,
-            lat=subject.latitude,
-            lng=subject.longitude,
-            tz_str=subject.timezone,
-            zodiac_type=subject.zodiac_type, # type: ignore
-            sidereal_mode=subject.sidereal_mode,
-            houses_system_identifier=subject.houses_system_identifier, # type: ignore
-            perspective_type=subject.perspective_type, # type: ignore
-            geonames_username=subject.geonames_username,
-            online=True if subject.geonames_username else False,
-        )
 
-        data = astrological_subject.model().model_dump()
+async def _birth_data(birth_data_request: BirthDataRequestModel) -> dict:
+    """
+    Builds the birth data response content.
+    """
 
-        response_dict = {"status": "OK", "data": data}
+    subject = birth_data_request.subject
 
-        return JSONResponse(content=response_dict, status_code=200)
+    astrological_subject = await run_in_threadpool(subject_from_model, subject)
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+    data = _dump_subject(astrological_subject)
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    return {"status": "OK", "data": data}
 
 
-@router.post("/api/v4/birth-chart", response_description="Birth chart", response_model=BirthChartResponseModel)
-async def birth_chart(request_body: BirthChartRequestModel, request: Request):
+async def _birth_chart(request_body: BirthChartRequestModel) -> dict:
     """
-    Retrieve an astrological birth chart for a specific birth date. Includes the data for the subject and the aspects.
+    Builds the birth chart response content.
     """
 
-    write_request_to_log(20, request, f"Birth chart request")
-
     subject = request_body.subject
 
-    try:
-        astrological_subject = AstrologicalSubject(
-            name=subject.name,
-            year=subject.year,
-            month=subject.month,
-            day=subject.day,
-            hour=subject.hour,
-            minute=subject.minute,
-            city=subject.city,
-            nation=subject.nation,
-            lat=subject.latitude,
-            lng=subject.longitude,
-            tz_str=subject.timezone,
-            zodiac_type=subject.zodiac_type, # type: ignore
-            sidereal_mode=subject.sidereal_mode,
-            houses_system_identifier=subject.houses_system_identifier, # type: ignore
-            perspective_type=subject.perspective_type, # type: ignore
-            geonames_username=subject.geonames_username,
-            online=True if subject.geonames_username else False,
-        )
+    astrological_subject = await run_in_threadpool(subject_from_model, subject)
 
-        data = astrological_subject.model().model_dump()
+    data = _dump_subject(astrological_subject)
 
-        kerykeion_chart = KerykeionChartSVG(
-            astrological_subject,
-            theme=request_body.theme,
-            chart_language=request_body.language or "EN",
-            active_points=request_body.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=request_body.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        )
+    kerykeion_chart = CachedKerykeionChartSVG(
+        astrological_subject,
+        theme=request_body.theme,
+        chart_language=request_body.language or "EN",
+        active_points=request_body.active_points or DEFAULT_ACTIVE_POINTS,
+        active_aspects=request_body.active_aspects or DEFAULT_ACTIVE_ASPECTS,
+    )
 
-        if request_body.wheel_only:
-            svg = kerykeion_chart.makeWheelOnlyTemplate(minify=True)
-        else:
-            svg = kerykeion_chart.makeTemplate(minify=True)
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "chart": svg,
-                "data": data,
-                "aspects": [aspect.model_dump() for aspect in kerykeion_chart.aspects_list]
-            },
-            status_code=200,
-        )
+    svg = await run_in_threadpool(_render_chart, kerykeion_chart, bool(request_body.wheel_only))
 
-    except Exception as e:
-        # If error contains "wrong username"
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
-
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    return {
+        "status": "OK",
+        "chart": svg,
+        "data": data,
+        "aspects": _ASPECTS_ADAPTER.dump_python(kerykeion_chart.aspects_list)
+    }
 
 
-@router.post("/api/v4/synastry-chart", response_description="Synastry data", response_model=SynastryChartResponseModel)
-async def synastry_chart(synastry_chart_request: SynastryChartRequestModel, request: Request):
+async def _synastry_chart(synastry_chart_request: SynastryChartRequestModel) -> dict:
     """
-    Retrieve a synastry chart between two subjects. Includes the data for the subjects and the aspects.
+    Builds the synastry chart response content.
     """
 
-    write_request_to_log(20, request, f"Synastry chart request")
-
     first_subject = synastry_chart_request.first_subject
     second_subject = synastry_chart_request.second_subject
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
+    # The two subjects are independent: compute them (and any Geonames lookups) concurrently
+    first_astrological_subject, second_astrological_subject = await gather(
+        run_in_threadpool(subject_from_model, first_subject),
+        run_in_threadpool(subject_from_model, second_subject),
+    )
+
+    kerykeion_chart = CachedKerykeionChartSVG(
+        first_astrological_subject,
+        second_obj=second_astrological_subject,
+        chart_type="Synastry",
+        theme=synastry_chart_request.theme,
+        chart_language=synastry_chart_request.language or "EN",
+        active_points=synastry_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
+        active_aspects=synastry_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
+    )
+
+    svg = await run_in_threadpool(_render_chart, kerykeion_chart, bool(synastry_chart_request.wheel_only))
+
+    return {
+        "status": "OK",
+        "chart": svg,
+        "aspects": _ASPECTS_ADAPTER.dump_python(kerykeion_chart.aspects_list),
+        "data": {
+            "first_subject": _dump_subject(first_astrological_subject),
+            "second_subject": _dump_subject(second_astrological_subject),
+        },
+    }
 
-        second_astrological_subject = AstrologicalSubject(
-            name=second_subject.name,
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=second_subject.zodiac_type, # type: ignore
-            sidereal_mode=second_subject.sidereal_mode,
-            houses_system_identifier=second_subject.houses_system_identifier, # type: ignore
-            perspective_type=second_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
 
-        kerykeion_chart = KerykeionChartSVG(
-            first_astrological_subject,
-            second_obj=second_astrological_subject,
-            chart_type="Synastry",
-            theme=synastry_chart_request.theme,
-            chart_language=synastry_chart_request.language or "EN",
-            active_points=synastry_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=synastry_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        )
+async def _transit_chart(transit_chart_request: TransitChartRequestModel) -> dict:
+    """
+    Builds the transit chart response content.
+    """
 
-        if synastry_chart_request.wheel_only:
-            svg = kerykeion_chart.makeWheelOnlyTemplate(minify=True)
-        else:
-            svg = kerykeion_chart.makeTemplate(minify=True)
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "chart": svg,
-                "aspects": [aspect.model_dump() for aspect in kerykeion_chart.aspects_list],
-                "data": {
-                    "first_subject": first_astrological_subject.model().model_dump(),
-                    "second_subject": second_astrological_subject.model().model_dump(),
-                },
-            },
-            status_code=200,
-        )
+    first_subject = transit_chart_request.first_subject
+    second_subject = transit_chart_request.transit_subject
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+    first_astrological_subject, second_astrological_subject = await gather(
+        run_in_threadpool(subject_from_model, first_subject),
+        run_in_threadpool(transit_subject_from_model, second_subject, first_subject),
+    )
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    kerykeion_chart = CachedKerykeionChartSVG(
+        first_astrological_subject,
+        second_obj=second_astrological_subject,
+        chart_type="Transit",
+        theme=transit_chart_request.theme,
+        chart_language=transit_chart_request.language or "EN",
+        active_points=transit_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
+        active_aspects=transit_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
+    )
 
+    svg = await run_in_threadpool(_render_chart, kerykeion_chart, bool(transit_chart_request.wheel_only))
 
-@router.post("/api/v4/transit-chart", response_description="Transit data", response_model=TransitChartResponseModel)
-async def transit_chart(transit_chart_request: TransitChartRequestModel, request: Request):
+    return {
+        "status": "OK",
+        "chart": svg,
+        "aspects": _ASPECTS_ADAPTER.dump_python(kerykeion_chart.aspects_list),
+        "data": {
+            "subject": _dump_subject(first_astrological_subject),
+            "transit": _dump_subject(second_astrological_subject),
+        },
+    }
+
+
+async def _transit_aspects_data(transit_chart_request: TransitChartRequestModel) -> dict:
     """
-    Retrieve a transit chart for a specific subject. Includes the data for the subject and the aspects.
+    Builds the transit aspects data response content.
     """
 
-    write_request_to_log(20, request, f"Transit chart request")
-
     first_subject = transit_chart_request.first_subject
     second_subject = transit_chart_request.transit_subject
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
+    first_astrological_subject, second_astrological_subject = await gather(
+        run_in_threadpool(subject_from_model, first_subject),
+        run_in_threadpool(transit_subject_from_model, second_subject, first_subject),
+    )
 
-        second_astrological_subject = AstrologicalSubject(
-            name="Transit",
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=first_astrological_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
+    aspects = SynastryAspects(
+        first_astrological_subject,
+        second_astrological_subject,
+        active_points=transit_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
+        active_aspects=transit_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
+    ).relevant_aspects
 
-        kerykeion_chart = KerykeionChartSVG(
-            first_astrological_subject,
-            second_obj=second_astrological_subject,
-            chart_type="Transit",
-            theme=transit_chart_request.theme,
-            chart_language=transit_chart_request.language or "EN",
-            active_points=transit_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=transit_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        )
+    return {
+        "status": "OK",
+        "data": {
+            "subject": _dump_subject(first_astrological_subject),
+            "transit": _dump_subject(second_astrological_subject),
+        },
+        "aspects": _ASPECTS_ADAPTER.dump_python(aspects),
+    }
 
-        if transit_chart_request.wheel_only:
-            svg = kerykeion_chart.makeWheelOnlyTemplate(minify=True)
-        else:
-            svg = kerykeion_chart.makeTemplate(minify=True)
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "chart": svg,
-                "aspects": [aspect.model_dump() for aspect in kerykeion_chart.aspects_list],
-                "data": {
-                    "subject": first_astrological_subject.model().model_dump(),
-                    "transit": second_astrological_subject.model().model_dump(),
-                },
-            },
-            status_code=200,
-        )
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+async def _synastry_aspects_data(aspects_request_content: SynastryAspectsRequestModel) -> dict:
+    """
+    Builds the synastry aspects data response content.
+    """
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    first_subject = aspects_request_content.first_subject
+    second_subject = aspects_request_content.second_subject
 
+    # The two subjects are independent: compute them (and any Geonames lookups) concurrently
+    first_astrological_subject, second_astrological_subject = await gather(
+        run_in_threadpool(subject_from_model, first_subject),
+        run_in_threadpool(subject_from_model, second_subject),
+    )
 
-@router.post("/api/v4/transit-aspects-data", response_description="Transit aspects data", response_model=TransitAspectsResponseModel)
-async def transit_aspects_data(transit_chart_request: TransitChartRequestModel, request: Request) -> JSONResponse:
+    aspects = SynastryAspects(
+        first_astrological_subject,
+        second_astrological_subject,
+        active_points=aspects_request_content.active_points or DEFAULT_ACTIVE_POINTS,
+        active_aspects=aspects_request_content.active_aspects or DEFAULT_ACTIVE_ASPECTS,
+    ).relevant_aspects
+
+    return {
+        "status": "OK",
+        "data": {
+            "first_subject": _dump_subject(first_astrological_subject),
+            "second_subject": _dump_subject(second_astrological_subject),
+        },
+        "aspects": _ASPECTS_ADAPTER.dump_python(aspects),
+    }
+
+
+async def _natal_aspects_data(aspects_request_content: NatalAspectsRequestModel) -> dict:
     """
-    Retrieve transit aspects and data for a specific subject. Does not include the chart.
+    Builds the natal aspects data response content.
     """
 
-    write_request_to_log(20, request, f"Transit aspects data request")
+    subject = aspects_request_content.subject
 
-    first_subject = transit_chart_request.first_subject
-    second_subject = transit_chart_request.transit_subject
+    first_astrological_subject = await run_in_threadpool(subject_from_model, subject)
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
+    aspects = NatalAspects(
+        first_astrological_subject,
+        active_points=aspects_request_content.active_points or DEFAULT_ACTIVE_POINTS,
+        active_aspects=aspects_request_content.active_aspects or DEFAULT_ACTIVE_ASPECTS,
+    ).relevant_aspects
 
-        second_astrological_subject = AstrologicalSubject(
-            name="Transit",
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=first_astrological_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
+    return {
+        "status": "OK",
+        "data": {"subject": _dump_subject(first_astrological_subject)},
+        "aspects": _ASPECTS_ADAPTER.dump_python(aspects),
+    }
 
-        aspects = SynastryAspects(
-            first_astrological_subject,
-            second_astrological_subject,
-            active_points=transit_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=transit_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        ).relevant_aspects
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "data": {
-                    "subject": first_astrological_subject.model().model_dump(),
-                    "transit": second_astrological_subject.model().model_dump(),
-                },
-                "aspects": [aspect.model_dump() for aspect in aspects],
-            },
-            status_code=200,
-        )
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+async def _relationship_score(relationship_score_request: RelationshipScoreRequestModel) -> dict:
+    """
+    Builds the relationship score response content.
+    """
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    first_subject = relationship_score_request.first_subject
+    second_subject = relationship_score_request.second_subject
 
+    # The two subjects are independent: compute them (and any Geonames lookups) concurrently
+    first_astrological_subject, second_astrological_subject = await gather(
+        run_in_threadpool(subject_from_model, first_subject),
+        run_in_threadpool(subject_from_model, second_subject),
+    )
 
-@router.post("/api/v4/synastry-aspects-data", response_description="Synastry aspects data", response_model=SynastryAspectsResponseModel)
-async def synastry_aspects_data(aspects_request_content: SynastryAspectsRequestModel, request: Request) -> JSONResponse:
+    score_factory = RelationshipScoreFactory(first_astrological_subject, second_astrological_subject)
+    score_model = score_factory.get_relationship_score()
+
+    return {
+        "status": "OK",
+        "score": score_model.score_value,
+        "score_description": score_model.score_description,
+        "is_destiny_sign": score_model.is_destiny_sign,
+        "aspects": _SCORE_ASPECTS_ADAPTER.dump_python(score_model.aspects),
+        "data": {
+            "first_subject": _dump_subject(first_astrological_subject),
+            "second_subject": _dump_subject(second_astrological_subject),
+        },
+    }
+
+
+async def _composite(composite_chart_request: CompositeChartRequestModel, include_chart: bool) -> dict:
     """
-    Retrieve synastry aspects between two subjects. Does not include the chart.
+    Builds the composite chart response content, or the composite aspects data
+    one when the chart is not included.
     """
 
-    write_request_to_log(20, request, f"Synastry aspects data request")
+    first_subject = composite_chart_request.first_subject
+    second_subject = composite_chart_request.second_subject
 
-    first_subject = aspects_request_content.first_subject
-    second_subject = aspects_request_content.second_subject
+    # The two subjects are independent: compute them (and any Geonames lookups) concurrently
+    first_astrological_subject, second_astrological_subject = await gather(
+        run_in_threadpool(subject_from_model, first_subject),
+        run_in_threadpool(subject_from_model, second_subject),
+    )
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
+    composite_subject = get_composite_subject(first_astrological_subject, second_astrological_subject)
 
-        second_astrological_subject = AstrologicalSubject(
-            name=second_subject.name,
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=second_subject.zodiac_type, # type: ignore
-            sidereal_mode=second_subject.sidereal_mode,
-            houses_system_identifier=second_subject.houses_system_identifier, # type: ignore
-            perspective_type=second_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
+    content: dict[str, Any] = {"status": "OK"}
 
-        aspects = SynastryAspects(
+    if include_chart:
+        content["chart"], aspects = await run_in_threadpool(
+            _render_composite_chart,
+            first_astrological_subject,
+            second_astrological_subject,
+            composite_chart_request.theme,
+            bool(composite_chart_request.wheel_only),
+        )
+    else:
+        aspects = await run_in_threadpool(
+            _composite_aspects,
             first_astrological_subject,
             second_astrological_subject,
-            active_points=aspects_request_content.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=aspects_request_content.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        ).relevant_aspects
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "data": {
-                    "first_subject": first_astrological_subject.model().model_dump(),
-                    "second_subject": second_astrological_subject.model().model_dump(),
-                },
-                "aspects": [aspect.model_dump() for aspect in aspects],
-            },
-            status_code=200,
+            tuple(composite_chart_request.active_points or DEFAULT_ACTIVE_POINTS),
+            tuple((aspect["name"], aspect["orb"]) for aspect in composite_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS),
         )
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+    content["aspects"] = aspects
+    content["data"] = {
+        "composite_subject": composite_subject.model_dump(exclude=_COMPOSITE_SUBJECT_EXCLUDE),
+        "first_subject": _dump_subject(first_astrological_subject),
+        "second_subject": _dump_subject(second_astrological_subject),
+    }
+
+    return content
+
+
+_composite_chart = partial(_composite, include_chart=True)
+_composite_aspects_data = partial(_composite, include_chart=False)
+
+
+async def _serve(
+    request: Request,
+    build: Callable[[Any], Awaitable[dict]],
+    request_model: Any,
+    chart_format: ChartFormat = "json",
+) -> Response:
+    """
+    Runs the response builder of an endpoint, mapping its failures to the error
+    responses shared by all the endpoints. Chart endpoints may ask for the
+    multipart format, errors are always JSON.
+    """
+
+    try:
+        content = await build(request_model)
+        if chart_format == "multipart":
+            return multipart_chart_response(content)
+
+        return ORJSONResponse(content=content, status_code=200)
 
+    except GeonamesCityNotFoundError as e:
+        write_request_to_log(40, request, e)
+        return GeonamesNotFoundJsonResponse
+
+    except Exception as e:
         write_request_to_log(40, request, e)
         return InternalServerErrorJsonResponse
 
 
-@router.post("/api/v4/natal-aspects-data", response_description="Birth aspects data", response_model=SynastryAspectsResponseModel)
-async def natal_aspects_data(aspects_request_content: NatalAspectsRequestModel, request: Request) -> JSONResponse:
+@router.get("/api/v4/health", response_description="Health check", include_in_schema=False)
+async def health(request: Request) -> ORJSONResponse:
     """
-    Retrieve natal aspects and data for a specific subject. Does not include the chart.
+    Health check endpoint.
     """
 
-    write_request_to_log(20, request, f"Natal aspects data request")
+    if random() < HEALTH_CHECK_LOG_SAMPLE_RATE:
+        write_request_to_log(20, request, "Health check")
 
-    subject = aspects_request_content.subject
+    return HealthCheckJsonResponse
+
+
+@router.get("/", response_description="Status of the API", response_model=BirthDataResponseModel, include_in_schema=False)
+async def status(request: Request) -> ORJSONResponse:
+    """
+    Returns the status of the API.
+    """
+
+    write_request_to_log(20, request, "API is up and running")
+
+    return StatusJsonResponse
+
+
+@router.get("/api/v4/now", response_description="Current astrological data", response_model=BirthDataResponseModel)
+async def get_now(request: Request) -> Response:
+    """
+    Retrieve astrological data for the current moment.
+    """
+
+    # Get current UTC time from the time API
+    write_request_to_log(20, request, "Getting current astrological data")
+
+    # The data only changes once a minute: serve the encoded body until the minute ends
+    global _now_body, _now_expires_at
+    if monotonic() < _now_expires_at:
+        return Response(content=_now_body, media_type="application/json")
 
+    logger.debug("Getting current UTC time from the time API")
     try:
-        first_astrological_subject = AstrologicalSubject(
-            name=subject.name,
-            year=subject.year,
-            month=subject.month,
-            day=subject.day,
-            hour=subject.hour,
-            minute=subject.minute,
-            city=subject.city,
-            nation=subject.nation,
-            lat=subject.latitude,
-            lng=subject.longitude,
-            tz_str=subject.timezone,
-            zodiac_type=subject.zodiac_type, # type: ignore
-            sidereal_mode=subject.sidereal_mode,
-            houses_system_identifier=subject.houses_system_identifier, # type: ignore
-            perspective_type=subject.perspective_type, # type: ignore
-            geonames_username=subject.geonames_username,
-            online=True if subject.geonames_username else False,
-        )
+        utc_datetime = await run_in_threadpool(get_time_from_google)
+        datetime_dict = {
+            "year": utc_datetime.year, # type: ignore
+            "month": utc_datetime.month, # type: ignore
+            "day": utc_datetime.day, # type: ignore
+            "hour": utc_datetime.hour, # type: ignore
+            "minute": utc_datetime.minute, # type: ignore
+            "second": utc_datetime.second, # type: ignore
+        }
+    except Exception as e:
+        write_request_to_log(40, request, e)
+        return InternalServerErrorJsonResponse
+    logger.debug(f"Current UTC time: {datetime_dict}")
 
-        aspects = NatalAspects(
-            first_astrological_subject,
-            active_points=aspects_request_content.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=aspects_request_content.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        ).relevant_aspects
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "data": {"subject": first_astrological_subject.model().model_dump()},
-                "aspects": [aspect.model_dump() for aspect in aspects],
-            },
-            status_code=200,
+    try:
+        # On some Cloud providers, the time is not set correctly, so we need to get the current UTC time from the time API
+        today_subject = await run_in_threadpool(
+            _greenwich_subject,
+            datetime_dict["year"],
+            datetime_dict["month"],
+            datetime_dict["day"],
+            datetime_dict["hour"],
+            datetime_dict["minute"],
         )
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+        response_dict = {"status": "OK", "data": _dump_subject(today_subject)}
+
+        _now_body = orjson.dumps(response_dict)
+        _now_expires_at = monotonic() + 60 - datetime_dict["second"]
+
+        return Response(content=_now_body, media_type="application/json")
 
+    except Exception as e:
         write_request_to_log(40, request, e)
         return InternalServerErrorJsonResponse
 
 
-@router.post("/api/v4/relationship-score", response_description="Relationship score", response_model=RelationshipScoreResponseModel)
-async def relationship_score(relationship_score_request: RelationshipScoreRequestModel, request: Request) -> JSONResponse:
+@router.post("/api/v4/birth-data", response_description="Birth data", response_model=BirthDataResponseModel)
+async def birth_data(birth_data_request: BirthDataRequestModel, request: Request):
+    """
+    Retrieve astrological data for a specific birth date. Does not include the chart nor the aspects.
     """
-    Calculates the relevance of the relationship between two subjects using the Ciro Discepolo method.
 
-    Results:
-        - 0 to 5: Minimal relationship
-        - 5 to 10: Medium relationship
-        - 10 to 15: Important relationship
-        - 15 to 20: Very important relationship
-        - 20 to 35: Exceptional relationship
-        - 30 and above: Rare Exceptional relationship
+    write_request_to_log(20, request, "Birth data request")
 
-    More details: https://www-cirodiscepolo-it.translate.goog/Articoli/Discepoloele.htm?_x_tr_sl=it&_x_tr_tl=en&_x_tr_hl=it&_x_tr_pto=wapp
+    return await _serve(request, _birth_data, birth_data_request)
+
+
+@router.post("/api/v4/birth-chart", response_description="Birth chart", response_model=BirthChartResponseModel)
+async def birth_chart(request_body: BirthChartRequestModel, request: Request, chart_format: ChartFormat = ChartFormatQuery):
+    """
+    Retrieve an astrological birth chart for a specific birth date. Includes the data for the subject and the aspects.
     """
 
-    first_subject = relationship_score_request.first_subject
-    second_subject = relationship_score_request.second_subject
+    write_request_to_log(20, request, "Birth chart request")
 
-    write_request_to_log(20, request, f"Getting composite data for: {first_subject} and {second_subject}")
+    return await _serve(request, _birth_chart, request_body, chart_format)
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
 
-        second_astrological_subject = AstrologicalSubject(
-            name=second_subject.name,
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=second_subject.zodiac_type, # type: ignore
-            sidereal_mode=second_subject.sidereal_mode,
-            houses_system_identifier=second_subject.houses_system_identifier, # type: ignore
-            perspective_type=second_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
+@router.post("/api/v4/synastry-chart", response_description="Synastry data", response_model=SynastryChartResponseModel)
+async def synastry_chart(synastry_chart_request: SynastryChartRequestModel, request: Request, chart_format: ChartFormat = ChartFormatQuery):
+    """
+    Retrieve a synastry chart between two subjects. Includes the data for the subjects and the aspects.
+    """
 
-        score_factory = RelationshipScoreFactory(first_astrological_subject, second_astrological_subject)
-        score_model = score_factory.get_relationship_score()
-
-        response_content = {
-            "status": "OK",
-            "score": score_model.score_value,
-            "score_description": score_model.score_description,
-            "is_destiny_sign": score_model.is_destiny_sign,
-            "aspects": [aspect.model_dump() for aspect in score_model.aspects],
-            "data": {
-                "first_subject": first_astrological_subject.model().model_dump(),
-                "second_subject": second_astrological_subject.model().model_dump(),
-            },
-        }
+    write_request_to_log(20, request, "Synastry chart request")
 
-        return JSONResponse(content=response_content, status_code=200)
+    return await _serve(request, _synastry_chart, synastry_chart_request, chart_format)
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+@router.post("/api/v4/transit-chart", response_description="Transit data", response_model=TransitChartResponseModel)
+async def transit_chart(transit_chart_request: TransitChartRequestModel, request: Request, chart_format: ChartFormat = ChartFormatQuery):
+    """
+    Retrieve a transit chart for a specific subject. Includes the data for the subject and the aspects.
+    """
 
+    write_request_to_log(20, request, "Transit chart request")
 
-@router.post("/api/v4/composite-chart", response_description="Composite data", response_model=CompositeChartResponseModel)
-async def composite_chart(composite_chart_request: CompositeChartRequestModel, request: Request) -> JSONResponse:
+    return await _serve(request, _transit_chart, transit_chart_request, chart_format)
+
+
+@router.post("/api/v4/transit-aspects-data", response_description="Transit aspects data", response_model=TransitAspectsResponseModel)
+async def transit_aspects_data(transit_chart_request: TransitChartRequestModel, request: Request) -> Response:
     """
-    Retrieve a composite chart between two subjects. Includes the data for the subjects and the aspects.
-    The method used is the midpoint method.
+    Retrieve transit aspects and data for a specific subject. Does not include the chart.
     """
 
-    first_subject = composite_chart_request.first_subject
-    second_subject = composite_chart_request.second_subject
+    write_request_to_log(20, request, "Transit aspects data request")
 
-    write_request_to_log(20, request, f"Getting composite data for: {first_subject} and {second_subject}")
+    return await _serve(request, _transit_aspects_data, transit_chart_request)
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
 
-        second_astrological_subject = AstrologicalSubject(
-            name=second_subject.name,
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=second_subject.zodiac_type, # type: ignore
-            sidereal_mode=second_subject.sidereal_mode,
-            houses_system_identifier=second_subject.houses_system_identifier, # type: ignore
-            perspective_type=second_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
+@router.post("/api/v4/synastry-aspects-data", response_description="Synastry aspects data", response_model=SynastryAspectsResponseModel)
+async def synastry_aspects_data(aspects_request_content: SynastryAspectsRequestModel, request: Request) -> Response:
+    """
+    Retrieve synastry aspects between two subjects. Does not include the chart.
+    """
 
-        composite_factory = CompositeSubjectFactory(first_astrological_subject, second_astrological_subject)
-        composite_subject = composite_factory.get_midpoint_composite_subject_model()
+    write_request_to_log(20, request, "Synastry aspects data request")
 
-        kerykeion_chart = KerykeionChartSVG(
-            composite_subject,
-            chart_type="Composite",
-            theme=composite_chart_request.theme
-        )
+    return await _serve(request, _synastry_aspects_data, aspects_request_content)
 
-        if composite_chart_request.wheel_only:
-            svg = kerykeion_chart.makeWheelOnlyTemplate(minify=True)
-        else:
-            svg = kerykeion_chart.makeTemplate(minify=True)
-
-        composite_subject_dict = composite_subject.model_dump()
-        for key in ["first_subject", "second_subject"]:
-            if key in composite_subject_dict:
-                composite_subject_dict.pop(key)
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "chart": svg,
-                "aspects": [aspect.model_dump() for aspect in kerykeion_chart.aspects_list],
-                "data": {
-                    "composite_subject": composite_subject_dict,
-                    "first_subject": first_astrological_subject.model().model_dump(),
-                    "second_subject": second_astrological_subject.model().model_dump(),
-                },
-            },
-            status_code=200,
-        )
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+@router.post("/api/v4/natal-aspects-data", response_description="Birth aspects data", response_model=SynastryAspectsResponseModel)
+async def natal_aspects_data(aspects_request_content: NatalAspectsRequestModel, request: Request) -> Response:
+    """
+    Retrieve natal aspects and data for a specific subject. Does not include the chart.
+    """
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
+    write_request_to_log(20, request, "Natal aspects data request")
 
+    return await _serve(request, _natal_aspects_data, aspects_request_content)
 
-@router.post("/api/v4/composite-aspects-data", response_description="Composite aspects data", response_model=CompositeAspectsResponseModel)
-async def composite_aspects_data(composite_chart_request: CompositeChartRequestModel, request: Request) -> JSONResponse:
+
+@router.post("/api/v4/relationship-score", response_description="Relationship score", response_model=RelationshipScoreResponseModel)
+async def relationship_score(relationship_score_request: RelationshipScoreRequestModel, request: Request) -> Response:
     """
-    Retrieves the data and the aspects for a composite chart between two subjects. Does not include the chart.
+    Calculates the relevance of the relationship between two subjects using the Ciro Discepolo method.
+
+    Results:
+        - 0 to 5: Minimal relationship
+        - 5 to 10: Medium relationship
+        - 10 to 15: Important relationship
+        - 15 to 20: Very important relationship
+        - 20 to 35: Exceptional relationship
+        - 30 and above: Rare Exceptional relationship
+
+    More details: https://www-cirodiscepolo-it.translate.goog/Articoli/Discepoloele.htm?_x_tr_sl=it&_x_tr_tl=en&_x_tr_hl=it&_x_tr_pto=wapp
     """
 
-    first_subject = composite_chart_request.first_subject
-    second_subject = composite_chart_request.second_subject
+    write_request_to_log(20, request, "Getting composite data for: %s and %s", relationship_score_request.first_subject, relationship_score_request.second_subject)
 
-    write_request_to_log(20, request, f"Getting composite data for: {first_subject} and {second_subject}")
+    return await _serve(request, _relationship_score, relationship_score_request)
 
-    try:
-        first_astrological_subject = AstrologicalSubject(
-            name=first_subject.name,
-            year=first_subject.year,
-            month=first_subject.month,
-            day=first_subject.day,
-            hour=first_subject.hour,
-            minute=first_subject.minute,
-            city=first_subject.city,
-            nation=first_subject.nation,
-            lat=first_subject.latitude,
-            lng=first_subject.longitude,
-            tz_str=first_subject.timezone,
-            zodiac_type=first_subject.zodiac_type, # type: ignore
-            sidereal_mode=first_subject.sidereal_mode,
-            houses_system_identifier=first_subject.houses_system_identifier, # type: ignore
-            perspective_type=first_subject.perspective_type, # type: ignore
-            geonames_username=first_subject.geonames_username,
-            online=True if first_subject.geonames_username else False,
-        )
 
-        second_astrological_subject = AstrologicalSubject(
-            name=second_subject.name,
-            year=second_subject.year,
-            month=second_subject.month,
-            day=second_subject.day,
-            hour=second_subject.hour,
-            minute=second_subject.minute,
-            city=second_subject.city,
-            nation=second_subject.nation,
-            lat=second_subject.latitude,
-            lng=second_subject.longitude,
-            tz_str=second_subject.timezone,
-            zodiac_type=second_subject.zodiac_type, # type: ignore
-            sidereal_mode=second_subject.sidereal_mode,
-            houses_system_identifier=second_subject.houses_system_identifier, # type: ignore
-            perspective_type=second_subject.perspective_type, # type: ignore
-            geonames_username=second_subject.geonames_username,
-            online=True if second_subject.geonames_username else False,
-        )
+@router.post("/api/v4/composite-chart", response_description="Composite data", response_model=CompositeChartResponseModel)
+async def composite_chart(composite_chart_request: CompositeChartRequestModel, request: Request, chart_format: ChartFormat = ChartFormatQuery) -> Response:
+    """
+    Retrieve a composite chart between two subjects. Includes the data for the subjects and the aspects.
+    The method used is the midpoint method.
+    """
 
-        composite_factory = CompositeSubjectFactory(first_astrological_subject, second_astrological_subject)
-        composite_data = composite_factory.get_midpoint_composite_subject_model()
-        aspects = NatalAspects(
-            composite_data,
-            active_points=composite_chart_request.active_points or DEFAULT_ACTIVE_POINTS,
-            active_aspects=composite_chart_request.active_aspects or DEFAULT_ACTIVE_ASPECTS,
-        ).relevant_aspects
-
-        composite_subject_dict = composite_data.model_dump()
-        for key in ["first_subject", "second_subject"]:
-            if key in composite_subject_dict:
-                composite_subject_dict.pop(key)
-
-        return JSONResponse(
-            content={
-                "status": "OK",
-                "data": {
-                    "composite_subject": composite_subject_dict,
-                    "first_subject": first_astrological_subject.model().model_dump(),
-                    "second_subject": second_astrological_subject.model().model_dump(),
-                },
-                "aspects": [aspect.model_dump() for aspect in aspects],
-            },
-            status_code=200,
-        )
+    write_request_to_log(20, request, "Getting composite data for: %s and %s", composite_chart_request.first_subject, composite_chart_request.second_subject)
 
-    except Exception as e:
-        if "data found for this city" in str(e):
-            write_request_to_log(40, request, e)
-            return JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": GEONAMES_ERROR_MESSAGE,
-                },
-                status_code=400,
-            )
+    return await _serve(request, _composite_chart, composite_chart_request, chart_format)
 
-        write_request_to_log(40, request, e)
-        return InternalServerErrorJsonResponse
\ No newline at end of file
+
+@router.post("/api/v4/composite-aspects-data", response_description="Composite aspects data", response_model=CompositeAspectsResponseModel)
+async def composite_aspects_data(composite_chart_request: CompositeChartRequestModel, request: Request) -> Response:
+    """
+    Retrieves the data and the aspects for a composite chart between two subjects. Does not include the chart.
+    """
+
+    write_request_to_log(20, request, "Getting composite data for: %s and %s", composite_chart_request.first_subject, composite_chart_request.second_subject)
+
+    return await _serve(request, _composite_aspects_data, composite_chart_request)
@@ -0,0 +1,48 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+from pathlib import Path
+from string import Template
+from typing import Union, get_args
+
+from kerykeion import KerykeionChartSVG
+from kerykeion.charts import kerykeion_chart_svg
+from kerykeion.kr_types.kr_literals import KerykeionChartTheme
+from kerykeion.utilities import inline_css_variables_in_svg
+from scour.scour import scourString
+
+_CHARTS_DIR = Path(kerykeion_chart_svg.__file__).parent
+_THEMES_DIR = _CHARTS_DIR / "themes"
+
+# Theme CSS and chart templates read once at import instead of on every chart
+_THEME_CSS = {theme: (_THEMES_DIR / f"{theme}.css").read_text() for theme in get_args(KerykeionChartTheme)}
+_CHART_TEMPLATE = Template((_CHARTS_DIR / "templates" / "chart.xml").read_text(encoding="utf-8", errors="ignore"))
+_WHEEL_ONLY_TEMPLATE = Template((_CHARTS_DIR / "templates" / "wheel_only.xml").read_text(encoding="utf-8", errors="ignore"))
+
+
+class CachedKerykeionChartSVG(KerykeionChartSVG):
+    """
+    KerykeionChartSVG that takes the theme stylesheet and the chart templates from memory.
+    """
+
+    def set_up_theme(self, theme: Union[KerykeionChartTheme, None] = None) -> None:
+        self.color_style_tag = _THEME_CSS[theme] if theme is not None else ""
+
+    def makeTemplate(self, minify: bool = False, remove_css_variables=False) -> str:
+        return self._render_template(_CHART_TEMPLATE, minify, remove_css_variables)
+
+    def makeWheelOnlyTemplate(self, minify: bool = False, remove_css_variables=False) -> str:
+        return self._render_template(_WHEEL_ONLY_TEMPLATE, minify, remove_css_variables)
+
+    def _render_template(self, template: Template, minify: bool, remove_css_variables: bool) -> str:
+        """Same rendering as kerykeion's make*Template methods, from a preloaded template"""
+        svg = template.substitute(self._create_template_dictionary())
+
+        if remove_css_variables:
+            svg = inline_css_variables_in_svg(svg)
+
+        if minify:
+            return scourString(svg).replace('"', "'").replace("\n", "").replace("\t", "").replace("    ", "").replace("  ", "")
+
+        return svg.replace('"', "'")
@@ -0,0 +1,12 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+from kerykeion import KerykeionException
+
+
+class GeonamesCityNotFoundError(KerykeionException):
+    """
+    Raised when Geonames returns no coordinates and timezone for a city, either
+    because the city/nation pair is wrong or the Geonames username is invalid.
+    """
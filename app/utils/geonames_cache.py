@@ -0,0 +1,137 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+import sqlite3
+import time
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from cachetools import TTLCache
+from kerykeion.fetch_geonames import FetchGeonames
+
+from ..config.settings import settings
+from .errors import GeonamesCityNotFoundError
+
+
+logger = getLogger(__name__)
+
+# Cities do not move: found locations are kept for as long as kerykeion's own
+# HTTP cache keeps them, on disk so they survive restarts and are shared by the
+# workers. Misses only absorb bursts of the same bad lookup: kerykeion reports
+# network errors and timeouts as misses too, so a Geonames blip must not turn
+# into a long run of 400s. They are kept in memory only.
+FOUND_TTL = 30 * 24 * 3600
+NOT_FOUND_TTL = 30
+
+# Found locations kept on disk; past this, the least recently used are dropped
+MAX_LOCATIONS = 50_000
+
+# last_used is only rewritten when older than this, so hits stay reads
+LAST_USED_RESOLUTION = 3600
+
+# Same message kerykeion raises for a failed lookup
+NOT_FOUND_MESSAGE = "No data found for this city, try again! Maybe check your connection?"
+
+
+class GeonamesLocation(NamedTuple):
+    lat: float
+    lng: float
+    tz_str: str
+    nation: str
+
+
+_connection: Optional[sqlite3.Connection] = None
+_misses: TTLCache = TTLCache(maxsize=1024, ttl=NOT_FOUND_TTL)
+_lock = Lock()
+
+
+def _get_connection() -> sqlite3.Connection:
+    global _connection
+
+    if _connection is None:
+        path = Path(settings.geonames_cache_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        # Earlier layout, which also stored misses per username
+        _connection.execute("DROP TABLE IF EXISTS locations")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS cities ("
+            "city TEXT NOT NULL, nation TEXT NOT NULL, "
+            "lat REAL NOT NULL, lng REAL NOT NULL, tz_str TEXT NOT NULL, country_code TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (city, nation))"
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS cities_last_used ON cities (last_used)")
+        _connection.execute("DELETE FROM cities WHERE expires_at <= ?", (time.time(),))
+
+    return _connection
+
+
+def _store(key: tuple, location: GeonamesLocation) -> None:
+    now = time.time()
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cities VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, *location, now + FOUND_TTL, now),
+        )
+        connection.execute("DELETE FROM cities WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM cities WHERE rowid IN "
+            "(SELECT rowid FROM cities ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (MAX_LOCATIONS,),
+        )
+
+
+def resolve(city: str, nation: str, username: str) -> GeonamesLocation:
+    """
+    Returns the coordinates, timezone and country code Geonames gives for a city,
+    from the cache when possible. Raises GeonamesCityNotFoundError when the city
+    cannot be found.
+    """
+
+    key = (city.strip().casefold(), nation.strip().upper())
+    now = time.time()
+
+    with _lock:
+        # Misses are kept per username: a bad username is not a missing city
+        if (*key, username) in _misses:
+            raise GeonamesCityNotFoundError(NOT_FOUND_MESSAGE)
+
+        connection = _get_connection()
+        row = connection.execute(
+            "SELECT lat, lng, tz_str, country_code, last_used FROM cities "
+            "WHERE city = ? AND nation = ? AND expires_at > ?",
+            (*key, now),
+        ).fetchone()
+
+        if row is not None:
+            if now - row[4] > LAST_USED_RESOLUTION:
+                connection.execute(
+                    "UPDATE cities SET last_used = ? WHERE city = ? AND nation = ?",
+                    (now, *key),
+                )
+            return GeonamesLocation(*row[:4])
+
+    city_data = FetchGeonames(city, nation, username=username).get_serialized_data()
+
+    if not all(field in city_data for field in ("countryCode", "timezonestr", "lat", "lng")):
+        logger.info("Geonames has no data for %s, %s", city, nation)
+        with _lock:
+            _misses[(*key, username)] = True
+        raise GeonamesCityNotFoundError(NOT_FOUND_MESSAGE)
+
+    location = GeonamesLocation(
+        float(city_data["lat"]),
+        float(city_data["lng"]),
+        city_data["timezonestr"],
+        city_data["countryCode"],
+    )
+    _store(key, location)
+
+    return location
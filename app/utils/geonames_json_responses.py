@@ -0,0 +1,23 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+from fastapi.responses import ORJSONResponse
+
+# Static error answers of the Geonames endpoints: the bodies are rendered once,
+# at import, and the same response objects are sent on every hit.
+
+MissingCredentialsJsonResponse = ORJSONResponse(
+    status_code=401,
+    content={"detail": "Geonames credentials not configured"},
+)
+
+RateLimitExceededJsonResponse = ORJSONResponse(
+    status_code=429,
+    content={"detail": "Rate limit exceeded"},
+)
+
+GeonamesServiceErrorJsonResponse = ORJSONResponse(
+    status_code=500,
+    content={"detail": "Error contacting Geonames service"},
+)
@@ -2,12 +2,22 @@
     This is part of Astrologer API (C) 2023 Giacomo Battaglia
 """
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
-InternalServerErrorJsonResponse = JSONResponse(
+GEONAMES_ERROR_MESSAGE = "City/Nation name error or invalid GeoNames username. Please check your username or city name and try again. You can create a free username here: https://www.geonames.org/login/. If you want to bypass the usage of GeoNames, please remove the geonames_username field from the request. Note: The nation field should be the country code (e.g. US, UK, FR, DE, etc.)."
+
+InternalServerErrorJsonResponse = ORJSONResponse(
     status_code=500,
     content={
         "message": "Internal Server Error",
         "status": "KO",
     },
 )
+
+GeonamesNotFoundJsonResponse = ORJSONResponse(
+    status_code=400,
+    content={
+        "status": "ERROR",
+        "message": GEONAMES_ERROR_MESSAGE,
+    },
+)
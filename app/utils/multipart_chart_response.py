@@ -0,0 +1,29 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+from secrets import token_hex
+
+import orjson
+from fastapi.responses import Response
+
+
+def multipart_chart_response(content: dict) -> Response:
+    """
+    Returns chart response content as multipart/mixed: the JSON content without the
+    chart, then the chart itself as a raw SVG part, so the SVG is not JSON-escaped.
+    """
+
+    chart: str = content.pop("chart")
+    # A fresh boundary per response, so no subject name can collide with it
+    boundary = token_hex(16)
+
+    body = b"".join((
+        f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+        orjson.dumps(content),
+        f"\r\n--{boundary}\r\nContent-Type: image/svg+xml\r\n\r\n".encode(),
+        chart.encode(),
+        f"\r\n--{boundary}--\r\n".encode(),
+    ))
+
+    return Response(content=body, media_type=f'multipart/mixed; boundary="{boundary}"')
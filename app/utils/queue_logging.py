@@ -0,0 +1,35 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+
+class _InProcessQueueHandler(QueueHandler):
+    # Records only cross threads, never processes, so they are queued as they are:
+    # the default prepare() would format them on the request path and drop the
+    # args that uvicorn's access formatter reads.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def start_queue_logging(*loggers: logging.Logger) -> list[QueueListener]:
+    """
+    Puts the handlers of each logger behind an unbounded queue drained by a
+    background thread, so logging from the event loop never waits on stream I/O.
+    Returns the started listeners; stop them on shutdown to flush the queues.
+    """
+    listeners = []
+    for logger in loggers:
+        if not logger.handlers:
+            continue
+
+        log_queue: SimpleQueue = SimpleQueue()
+        listener = QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+        logger.handlers = [_InProcessQueueHandler(log_queue)]
+        listener.start()
+        listeners.append(listener)
+
+    return listeners
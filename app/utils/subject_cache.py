@@ -0,0 +1,168 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+from copy import copy
+from functools import lru_cache
+from threading import Lock
+from typing import Optional
+
+from cachetools import LRUCache, cached
+from kerykeion import AstrologicalSubject, CompositeSubjectFactory
+from kerykeion.kr_types.kr_models import CompositeSubjectModel
+
+from ..config.settings import settings
+from .geonames_cache import resolve as resolve_location
+from ..types.request_models import SubjectModel, TransitSubjectModel
+
+# Swiss Ephemeris keeps global state (sidereal mode, topocentric position), so
+# subjects computed in worker threads are built one at a time
+ephemeris_lock = Lock()
+
+
+@lru_cache(maxsize=settings.subject_cache_size)
+def _build_subject(
+    year: int,
+    month: int,
+    day: int,
+    hour: int,
+    minute: int,
+    city: str,
+    nation: str,
+    lat: Optional[float],
+    lng: Optional[float],
+    tz_str: Optional[str],
+    zodiac_type: str,
+    sidereal_mode: Optional[str],
+    houses_system_identifier: str,
+    perspective_type: str,
+    geonames_username: Optional[str],
+) -> AstrologicalSubject:
+    """
+    Computes the ephemeris for a set of birth data. Repeated birth data is served
+    from the cache; failed lookups raise and are not cached. The returned subject
+    is shared, callers must not modify it.
+    """
+
+    with ephemeris_lock:
+        return AstrologicalSubject(
+            year=year,
+            month=month,
+            day=day,
+            hour=hour,
+            minute=minute,
+            city=city,
+            nation=nation,
+            lat=lat,
+            lng=lng,
+            tz_str=tz_str,
+            zodiac_type=zodiac_type, # type: ignore
+            sidereal_mode=sidereal_mode, # type: ignore
+            houses_system_identifier=houses_system_identifier, # type: ignore
+            perspective_type=perspective_type, # type: ignore
+            geonames_username=geonames_username,
+            online=bool(geonames_username),
+        )
+
+
+def get_subject(name: str, **birth_data) -> AstrologicalSubject:
+    """
+    Returns the subject for the birth data under the given name. The name does not
+    affect the calculations, so it is kept out of the ephemeris cache key and set
+    on a copy, together with the key the composite caches use for the subject.
+    """
+
+    # Resolve the city through the persistent location cache, so the ephemeris is
+    # computed offline and shares cache entries with coordinate requests
+    geonames_username = birth_data["geonames_username"]
+    if geonames_username:
+        location = resolve_location(birth_data["city"], birth_data["nation"], geonames_username)
+        birth_data.update(
+            lat=location.lat,
+            lng=location.lng,
+            tz_str=location.tz_str,
+            nation=location.nation,
+            geonames_username=None,
+        )
+
+    astrological_subject = copy(_build_subject(**birth_data))
+    astrological_subject.name = name
+    # A plain data key, so cached composite results do not keep subjects alive
+    astrological_subject.cache_key = (name, *sorted(birth_data.items())) # type: ignore
+    return astrological_subject
+
+
+def composite_key(first_subject: AstrologicalSubject, second_subject: AstrologicalSubject, *args) -> tuple:
+    """
+    Returns the cache key of a computation on two subjects from get_subject and
+    any further hashable arguments.
+    """
+
+    return (first_subject.cache_key, second_subject.cache_key, *args) # type: ignore
+
+
+@cached(LRUCache(maxsize=256), key=composite_key, lock=Lock())
+def get_composite_subject(
+    first_subject: AstrologicalSubject,
+    second_subject: AstrologicalSubject,
+) -> CompositeSubjectModel:
+    """
+    Returns the midpoint composite of two subjects from get_subject, so the chart
+    and aspects endpoints reuse the midpoints of the same pair. The model refers to
+    the points of both subjects, hence the small cache. The returned model is
+    shared, callers must not modify it.
+    """
+
+    return CompositeSubjectFactory(first_subject, second_subject).get_midpoint_composite_subject_model()
+
+
+def subject_from_model(subject: SubjectModel) -> AstrologicalSubject:
+    """
+    Returns the subject described by a request subject model.
+    """
+
+    return get_subject(
+        name=subject.name,
+        year=subject.year,
+        month=subject.month,
+        day=subject.day,
+        hour=subject.hour,
+        minute=subject.minute,
+        city=subject.city,
+        nation=subject.nation,
+        lat=subject.latitude,
+        lng=subject.longitude,
+        tz_str=subject.timezone,
+        zodiac_type=subject.zodiac_type,
+        sidereal_mode=subject.sidereal_mode,
+        houses_system_identifier=subject.houses_system_identifier,
+        perspective_type=subject.perspective_type,
+        geonames_username=subject.geonames_username,
+    )
+
+
+def transit_subject_from_model(transit_subject: TransitSubjectModel, subject: SubjectModel) -> AstrologicalSubject:
+    """
+    Returns the transit moment described by a request model, computed with the
+    zodiac, sidereal mode, house system and perspective of the subject it is
+    compared with.
+    """
+
+    return get_subject(
+        name="Transit",
+        year=transit_subject.year,
+        month=transit_subject.month,
+        day=transit_subject.day,
+        hour=transit_subject.hour,
+        minute=transit_subject.minute,
+        city=transit_subject.city,
+        nation=transit_subject.nation,
+        lat=transit_subject.latitude,
+        lng=transit_subject.longitude,
+        tz_str=transit_subject.timezone,
+        zodiac_type=subject.zodiac_type,
+        sidereal_mode=subject.sidereal_mode,
+        houses_system_identifier=subject.houses_system_identifier,
+        perspective_type=subject.perspective_type,
+        geonames_username=transit_subject.geonames_username,
+    )
@@ -0,0 +1,35 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+import re
+
+
+# Quoted attribute values (kerykeion templates use single quotes) and, inside them,
+# numbers with three or more decimals. Text nodes are left untouched.
+_ATTRIBUTE_RE = re.compile(r"='([^']*)'")
+_LONG_FLOAT_RE = re.compile(r"\d+\.\d{3,}")
+_INTER_TAG_SPACE_RE = re.compile(r">\s+<")
+
+
+def _round_float(match: re.Match) -> str:
+    # Two decimals are sub-pixel on the 820x550 chart viewBox
+    return f"{float(match.group()):.2f}"
+
+
+def _shrink_attribute(match: re.Match) -> str:
+    value = match.group(1)
+    if "." not in value:
+        return match.group()
+
+    return "='" + _LONG_FLOAT_RE.sub(_round_float, value) + "'"
+
+
+def shrink_svg(svg: str) -> str:
+    """
+    Reduces the size of a minified kerykeion SVG: coordinates in attributes are
+    rounded to two decimals and whitespace between tags is removed.
+    """
+
+    svg = _ATTRIBUTE_RE.sub(_shrink_attribute, svg)
+    return _INTER_TAG_SPACE_RE.sub("><", svg)
@@ -7,7 +7,14 @@ from fastapi import Request
 
 
 def get_write_request_to_log(logger: Logger):
-    def write_request_to_log(level, request: Request, message: str | Exception):
-        logger.log(level, f"{str(request.url)}: {str(message)}")
+    def write_request_to_log(level, request: Request, message: str | Exception, *args):
+        # Skip all formatting when the level is disabled; `args` are %-interpolated lazily
+        if not logger.isEnabledFor(level):
+            return
+
+        if args:
+            logger.log(level, "%s: " + str(message), request.url, *args)
+        else:
+            logger.log(level, "%s: %s", request.url, message)
 
     return write_request_to_log
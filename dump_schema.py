@@ -4,14 +4,16 @@ Open-source version - no RapidAPI dependencies
 """
 
 from app.main import app
-import json
+import orjson
 
 
 def dump_schema(output_file_path):
     """
     Generates a clean OpenAPI schema without proprietary dependencies
     """
-    openapi_data = app.openapi()
+    # app.openapi() builds the schema once and caches it on the app; work on a
+    # shallow copy so the servers below do not leak into the served schema
+    openapi_data = dict(app.openapi())
 
     # Set the base URL to localhost for development
     # Users can change this in production to their own domain
@@ -27,8 +29,8 @@ def dump_schema(output_file_path):
     ]
 
     # Save the clean OpenAPI JSON file
-    with open(output_file_path, 'w') as file:
-        json.dump(openapi_data, file, indent=2)
+    with open(output_file_path, 'wb') as file:
+        file.write(orjson.dumps(openapi_data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
 
     print(f"✅ OpenAPI schema generated successfully at: {output_file_path}")
     print("📝 You can validate it at: https://editor-next.swagger.io/")
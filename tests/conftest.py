@@ -0,0 +1,24 @@
+"""
+    This is part of Astrologer API (C) 2023 Giacomo Battaglia
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    One test client shared by the whole session.
+    """
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def geonames_status(client):
+    """
+    The Geonames status response, fetched once for the tests that only read it.
+    """
+    return client.get("/api/v4/geonames/status")
@@ -4,24 +4,28 @@ These tests verify the open-source Geonames integration with credential manageme
 rate limiting, and PT-BR optimizations.
 """
 
-from fastapi.testclient import TestClient
-from app.main import app
+from app.geonames.pt_br_optimizer import PtBrOptimizer
+from app.geonames.service import GeonamesService
+from app.geonames.rate_limiter import RateLimiter
+from app.geonames import credential_manager
+from app.geonames.credential_manager import CredentialManager
+import asyncio
 import os
+import time
+import pytest
 
-client = TestClient(app)
 
-
-def test_geonames_status():
+def test_geonames_status(geonames_status):
     """
     Tests if the Geonames status endpoint returns the correct status.
     """
-    response = client.get("/api/v4/geonames/status")
+    response = geonames_status
     
     # This test will work even without a Geonames key since it only validates the service is available
     assert response.status_code in [200, 401, 500]  # Different possible states
 
 
-def test_geonames_search():
+def test_geonames_search(client):
     """
     Tests Geonames search functionality.
     """
@@ -39,7 +43,7 @@ def test_geonames_search():
         assert response.status_code == 401
 
 
-def test_geonames_timezone():
+def test_geonames_timezone(client):
     """
     Tests Geonames timezone functionality.
     """
@@ -57,7 +61,19 @@ def test_geonames_timezone():
         assert response.status_code == 401
 
 
-def test_geonames_country_info():
+def test_geonames_timezone_rejects_bad_coordinates(client):
+    """
+    Tests that malformed or out-of-range coordinates are rejected as client errors, not 500s.
+    """
+    geonames_username = os.getenv("GEONAMES_USERNAME")
+    expected_status = 422 if geonames_username else 401
+
+    for params in ({"lat": "abc", "lng": -0.1278}, {"lat": 91, "lng": -0.1278}, {"lng": -0.1278}):
+        response = client.get("/api/v4/geonames/timezone", params=params)
+        assert response.status_code == expected_status
+
+
+def test_geonames_country_info(client):
     """
     Tests Geonames country info functionality.
     """
@@ -69,13 +85,18 @@ def test_geonames_country_info():
         data = response.json()
         assert "geonames" in data
         assert len(data["geonames"]) > 0
+
+        # Repeated requests revalidate against the ETag without a body
+        etag = response.headers["etag"]
+        response = client.get("/api/v4/geonames/country-info", params={"country": "GB"}, headers={"If-None-Match": etag})
+        assert response.status_code == 304
     else:
         # Without credentials, expect 401 error
         response = client.get("/api/v4/geonames/country-info", params={"country": "GB"})
         assert response.status_code == 401
 
 
-def test_geonames_brazilian_search():
+def test_geonames_brazilian_search(client):
     """
     Tests Geonames Brazilian search functionality with PT-BR optimizations.
     """
@@ -100,13 +121,13 @@ def test_geonames_brazilian_search():
         assert response.status_code == 401
 
 
-def test_geonames_rate_limiting():
+def test_geonames_rate_limiting(geonames_status):
     """
     Tests that Geonames endpoints respect rate limiting.
     """
     # This test is difficult to implement without triggering actual rate limits
     # For now, just verify the rate limit status is accessible
-    response = client.get("/api/v4/geonames/status")
+    response = geonames_status
     if response.status_code in [200, 401, 500]:
         data = response.json()
         if "rate_limiting" in data:
@@ -114,15 +135,235 @@ def test_geonames_rate_limiting():
             assert "current_hour" in data["rate_limiting"]
 
 
-def test_credential_management():
+def test_credential_management(geonames_status):
     """
     Tests credential management functionality.
     """
-    response = client.get("/api/v4/geonames/status")
+    response = geonames_status
     
     # Check that the response includes credential status information
     if response.status_code in [200, 401, 500]:
         data = response.json()
         if "credential_status" in data:
             assert "is_valid" in data["credential_status"]
-            assert "last_checked" in data["credential_status"]
\ No newline at end of file
+            assert "last_checked" in data["credential_status"]
+
+
+def test_pt_br_lookups_ignore_accents_and_case():
+    """
+    Tests that Brazilian city, state and timezone lookups match regardless of accents and case.
+    """
+    optimizer = PtBrOptimizer(GeonamesService())
+
+    assert optimizer.get_portuguese_city_name("sao paulo") == "São Paulo"
+    assert optimizer.get_portuguese_city_name("BRASILIA") == "Brasília"
+    assert optimizer.get_portuguese_city_name("Unknown City") == "Unknown City"
+    assert optimizer.get_brazilian_state_capital("Ceara") == "Fortaleza"
+    assert optimizer.get_brazilian_state_capital("Atlantis") is None
+
+
+def test_rate_limiter_blocks_after_limit():
+    """
+    Tests that the rate limiter rejects requests once the per-minute budget is used up.
+    """
+    limiter = RateLimiter(requests_per_minute=3, requests_per_hour=100)
+
+    results = [limiter.is_allowed() for _ in range(4)]
+    assert results == [True, True, True, False]
+
+    stats = limiter.get_usage_stats()
+    assert stats["current_minute"]["count"] == 3
+    assert stats["current_minute"]["remaining"] == 0
+
+
+def test_cache_hit_bypasses_rate_limiter():
+    """
+    Tests that cached Geonames answers are served without spending rate limit budget.
+    """
+    limiter = RateLimiter(requests_per_minute=1, requests_per_hour=100)
+    service = GeonamesService(limiter)
+    service.username = "demo"
+    service.static_cache[service._cache_key("countryInfoJSON", {"country": "BR"})] = {"geonames": []}
+
+    for _ in range(3):
+        assert asyncio.run(service.get_country_info("BR")) == {"geonames": []}
+    assert limiter.get_usage_stats()["current_minute"]["count"] == 0
+
+
+class FakeGeonamesSession:
+    """
+    Stands in for the aiohttp session, answering every call with the same JSON body.
+    """
+    closed = False
+
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+
+    def get(self, url, params):
+        self.calls.append(url)
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        await asyncio.sleep(0.01)
+        return self.body
+
+
+def test_concurrent_identical_calls_share_one_upstream_request():
+    """
+    Tests that concurrent cache misses for the same Geonames call are coalesced into one upstream request.
+    """
+    limiter = RateLimiter(requests_per_minute=100, requests_per_hour=100)
+    service = GeonamesService(limiter)
+    service.username = "demo"
+    session = FakeGeonamesSession(b'{"geonames": []}')
+
+    async def run():
+        service._session = session
+        return await asyncio.gather(*(service.get_country_info("BR") for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"geonames": []}] * 5
+    assert len(session.calls) == 1
+    assert limiter.get_usage_stats()["current_minute"]["count"] == 1
+
+
+def test_brazilian_search_leaves_cached_search_rows_untouched():
+    """
+    Tests that Portuguese names added by the Brazilian search do not leak into cached plain search results.
+    """
+    service = GeonamesService()
+    service.username = "demo"
+    optimizer = PtBrOptimizer(service)
+    session = FakeGeonamesSession(b'{"geonames": [{"name": "Sao Paulo", "countryCode": "BR"}]}')
+
+    async def run():
+        service._session = session
+        brazilian = await optimizer.search_brazilian_places("Sao Paulo", 10)
+        plain = await service.search("Sao Paulo", 10, lang="pt")
+        return brazilian, plain
+
+    brazilian, plain = asyncio.run(run())
+    assert brazilian["geonames"][0]["portugueseName"] == "São Paulo"
+    assert "portugueseName" not in plain["geonames"][0]
+    assert len(session.calls) == 1
+
+
+def test_authorization_error_invalidates_credential(monkeypatch):
+    """
+    Tests that a Geonames authorization error is not cached and disables the credential for a while.
+    """
+    credentials = CredentialManager()
+    credentials._is_valid = True
+    service = GeonamesService(credential_manager=credentials)
+    service.username = "demo"
+    session = FakeGeonamesSession(b'{"status": {"message": "user account not enabled", "value": 10}}')
+
+    async def run():
+        service._session = session
+        await service.get_country_info("BR")
+        return await service.get_country_info("BR")
+
+    assert asyncio.run(run())["status"]["value"] == 10
+    assert len(session.calls) == 2
+    assert not credentials.is_credential_valid()
+    assert credentials.validate_credential()["error"] == "user account not enabled"
+
+    # The rejection is retried once VALIDATION_TTL is over
+    later = time.time() + credential_manager.VALIDATION_TTL + 1
+    monkeypatch.setattr(credential_manager.time, "time", lambda: later)
+    assert credentials.is_credential_valid()
+    assert "error" not in credentials.validate_credential()
+
+
+def test_location_cache_serves_repeats_from_disk_and_misses_from_memory(tmp_path, monkeypatch):
+    """
+    Tests that city lookups, found or not, reach Geonames only once, and that misses expire quickly.
+    """
+    from app.utils import geonames_cache
+    from cachetools import TTLCache
+    from kerykeion import KerykeionException
+
+    lookups = []
+
+    class FakeFetchGeonames:
+        def __init__(self, city, nation, username):
+            lookups.append(city)
+            self.city = city
+
+        def get_serialized_data(self):
+            if self.city == "Roma":
+                return {"countryCode": "IT", "timezonestr": "Europe/Rome", "lat": "41.89193", "lng": "12.51133"}
+            return {}
+
+    clock = [0.0]
+    monkeypatch.setattr(geonames_cache, "FetchGeonames", FakeFetchGeonames)
+    monkeypatch.setattr(geonames_cache.settings, "geonames_cache_path", str(tmp_path / "locations.sqlite3"))
+    monkeypatch.setattr(geonames_cache, "_connection", None)
+    monkeypatch.setattr(geonames_cache, "_misses", TTLCache(maxsize=16, ttl=geonames_cache.NOT_FOUND_TTL, timer=lambda: clock[0]))
+
+    for _ in range(2):
+        location = geonames_cache.resolve("Roma", "IT", "demo")
+        assert location == (41.89193, 12.51133, "Europe/Rome", "IT")
+
+        with pytest.raises(KerykeionException):
+            geonames_cache.resolve("Rmoa", "IT", "demo")
+
+    assert lookups == ["Roma", "Rmoa"]
+
+    # Only found locations reach the disk
+    rows = geonames_cache._connection.execute("SELECT city FROM cities").fetchall()
+    assert rows == [("roma",)]
+
+    # Misses may be network errors, so only they are retried once their short TTL is over
+    clock[0] += geonames_cache.NOT_FOUND_TTL + 1
+    geonames_cache.resolve("Roma", "IT", "demo")
+    with pytest.raises(KerykeionException):
+        geonames_cache.resolve("Rmoa", "IT", "demo")
+
+    assert lookups == ["Roma", "Rmoa", "Rmoa"]
+
+
+def test_location_cache_drops_least_recently_used_and_expired_rows(tmp_path, monkeypatch):
+    """
+    Tests that the on-disk location cache stays within its size cap and sheds expired rows.
+    """
+    from app.utils import geonames_cache
+
+    class FakeFetchGeonames:
+        def __init__(self, city, nation, username):
+            self.city = city
+
+        def get_serialized_data(self):
+            return {"countryCode": "IT", "timezonestr": "Europe/Rome", "lat": "41.9", "lng": "12.5"}
+
+    now = [time.time()]
+    monkeypatch.setattr(geonames_cache, "FetchGeonames", FakeFetchGeonames)
+    monkeypatch.setattr(geonames_cache.settings, "geonames_cache_path", str(tmp_path / "locations.sqlite3"))
+    monkeypatch.setattr(geonames_cache, "_connection", None)
+    monkeypatch.setattr(geonames_cache, "MAX_LOCATIONS", 2)
+    monkeypatch.setattr(geonames_cache.time, "time", lambda: now[0])
+
+    def cached_cities():
+        return {row[0] for row in geonames_cache._connection.execute("SELECT city FROM cities")}
+
+    for city in ("Roma", "Milano"):
+        geonames_cache.resolve(city, "IT", "demo")
+        now[0] += geonames_cache.LAST_USED_RESOLUTION + 1
+
+    # A hit refreshes Roma, so Milano is the one dropped for Napoli
+    geonames_cache.resolve("Roma", "IT", "demo")
+    now[0] += 1
+    geonames_cache.resolve("Napoli", "IT", "demo")
+    assert cached_cities() == {"roma", "napoli"}
+
+    # Expired rows are dropped as soon as the cache is opened again
+    now[0] += geonames_cache.FOUND_TTL + 1
+    monkeypatch.setattr(geonames_cache, "_connection", None)
+    geonames_cache._get_connection()
+    assert cached_cities() == set()
@@ -7,8 +7,10 @@ from pathlib import Path
 
 path.append(str(Path(__file__).parent.parent))
 
+import orjson
 from fastapi.testclient import TestClient
 from app.main import app
+from app.utils.svg_shrink import shrink_svg
 from datetime import datetime, timezone
 
 client = TestClient(app)
@@ -85,6 +87,59 @@ def test_birth_data():
     assert response.json()["data"]["lunar_phase"]["moon_emoji"] == "🌖"
 
 
+def test_birth_data_same_birth_different_names():
+    """
+    Tests that repeated birth data keeps each request's own name.
+    """
+
+    subject = {
+        "year": 1946,
+        "month": 6,
+        "day": 16,
+        "hour": 10,
+        "minute": 10,
+        "longitude": 12.4963655,
+        "latitude": 41.9027835,
+        "city": "Roma",
+        "nation": "IT",
+        "timezone": "Europe/Rome",
+    }
+
+    first = client.post("/api/v4/birth-data", json={"subject": {**subject, "name": "First"}}).json()
+    second = client.post("/api/v4/birth-data", json={"subject": {**subject, "name": "Second"}}).json()
+
+    assert first["data"]["name"] == "First"
+    assert second["data"]["name"] == "Second"
+    assert first["data"]["sun"] == second["data"]["sun"]
+
+
+def test_composite_aspects_data_same_births_different_names():
+    """
+    Tests that cached composite midpoints keep each request's subject names.
+    """
+
+    subject = {
+        "year": 1946,
+        "month": 6,
+        "day": 16,
+        "hour": 10,
+        "minute": 10,
+        "longitude": 12.4963655,
+        "latitude": 41.9027835,
+        "city": "Roma",
+        "nation": "IT",
+        "timezone": "Europe/Rome",
+    }
+    partner = {**subject, "name": "Partner", "year": 1950}
+
+    first = client.post("/api/v4/composite-aspects-data", json={"first_subject": {**subject, "name": "First"}, "second_subject": partner}).json()
+    second = client.post("/api/v4/composite-aspects-data", json={"first_subject": {**subject, "name": "Second"}, "second_subject": partner}).json()
+
+    assert first["data"]["composite_subject"]["name"] == "First and Partner Composite Chart"
+    assert second["data"]["composite_subject"]["name"] == "Second and Partner Composite Chart"
+    assert first["data"]["composite_subject"]["sun"] == second["data"]["composite_subject"]["sun"]
+
+
 def test_relationship_score():
     """
     Tests if the relationship score is returned correctly
@@ -188,6 +243,7 @@ def test_birth_chart():
     # ------------------
 
     assert type(response.json()["chart"]) == str
+    assert response.headers["content-encoding"] == "gzip"
 
     # ------------------
     # Aspects
@@ -203,3 +259,53 @@ def test_birth_chart():
     assert round(response.json()["aspects"][0]["diff"]) == 58
     assert response.json()["aspects"][0]["p1"] == 0
     assert response.json()["aspects"][0]["p2"] == 1
+
+
+def test_birth_chart_multipart():
+    """
+    Tests that the multipart format returns the JSON data and the raw SVG chart as separate parts
+    """
+
+    response = client.post(
+        "/api/v4/birth-chart?format=multipart",
+        json={
+            "subject": {
+                "name": "FastAPI Unit Test",
+                "year": 1980,
+                "month": 12,
+                "day": 12,
+                "hour": 12,
+                "minute": 12,
+                "longitude": 0,
+                "latitude": 51.4825766,
+                "city": "London",
+                "nation": "GB",
+                "timezone": "Europe/London",
+            }
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("multipart/mixed; boundary=")
+
+    boundary = response.headers["content-type"].split("boundary=")[1].strip('"')
+    parts = response.content.split(f"--{boundary}".encode())
+    json_part = parts[1].split(b"\r\n\r\n", 1)[1].strip()
+    svg_part = parts[2].split(b"\r\n\r\n", 1)[1].strip()
+
+    data = orjson.loads(json_part)
+    assert data["status"] == "OK"
+    assert "chart" not in data
+    assert data["data"]["sun"]["sign"] == "Sag"
+    assert svg_part.endswith(b"</svg>")
+    assert parts[3].strip() == b"--"
+
+
+def test_shrink_svg():
+    """
+    Tests that SVG attribute coordinates are rounded and inter-tag whitespace removed, leaving text alone.
+    """
+
+    svg = "<g> <circle cx='63.454' cy='10' r='44.73500205473364'/> <text x='1.5'>12.3456</text></g>"
+
+    assert shrink_svg(svg) == "<g><circle cx='63.45' cy='10' r='44.74'/><text x='1.5'>12.3456</text></g>"